@@ -0,0 +1,12 @@
+#!/usr/bin/python3
+"""Benchmarks for the HBNB storage engines.
+
+Run a benchmark from the repository root with
+``python3 -m benchmarks.<name>``. Importing this package moves the
+process into a scratch directory first, so that the benchmarks never
+read or overwrite the repository's file.json.
+"""
+import os
+import tempfile
+
+os.chdir(tempfile.mkdtemp(prefix="hbnb_bench_"))
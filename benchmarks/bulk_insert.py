@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Measures inserting and updating Places by batches.
+
+For each engine and batch size, in a fresh process with an empty store,
+the Places are created then passed to storage.bulk_new() one batch at
+a time, then renamed and passed to storage.bulk_update() the same way;
+the rows per second of both are printed, and those of obj.save() per
+object (as the console and the main_*.py scripts do). Batches of 1 and
+obj.save() run on the first 2000 Places only, FileStorage rewriting
+its file at each save().
+Engines: file.json and SQLite.
+
+Usage: python3 -m benchmarks.bulk_insert [places]
+       (default: 20000 places)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+MEASURE = """
+import sys
+import time
+from models import storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+size, batch_size = int(sys.argv[1]), int(sys.argv[2])
+state, user = State(name="California"), User(email="a@b.c", password="pw")
+city = City(name="Napa", state_id=state.id)
+storage.bulk_new([state, city, user])
+places = [Place(name="House{}".format(i), city_id=city.id, user_id=user.id,
+                description="Nice " * 20, number_rooms=3, price_by_night=90)
+          for i in range(size)]
+
+
+def timed(write):
+    start = time.perf_counter()
+    if batch_size:
+        for i in range(0, size, batch_size):
+            write(places[i:i + batch_size], batch_size)
+    else:
+        for place in places:
+            place.save()
+    return size / (time.perf_counter() - start)
+
+
+inserted = timed(storage.bulk_new)
+for place in places:
+    place.name += "!"
+updated = timed(storage.bulk_update)
+assert storage.count(Place) == size
+print(inserted, updated)
+"""
+
+ENGINES = (
+    ("file", {}),
+    ("sqlite", {"HBNB_TYPE_STORAGE": "sqlite", "HBNB_ENV": "test"}),
+)
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_ENV", "HBNB_SQLITE_PATH",
+                 "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT",
+                 "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    print("{:>7} {:>10} {:>7} {:>15} {:>15}".format(
+        "engine", "batch", "rows", "insert (rows/s)", "update (rows/s)"))
+    for engine, extra in ENGINES:
+        for batch_size in (0, 1, 100, 10000):
+            rows = min(size, 2000) if batch_size <= 1 else size
+            if os.path.exists("file.json"):
+                os.remove("file.json")
+            inserted, updated = map(float, run(
+                MEASURE, dict(env, **extra), str(rows), str(batch_size)))
+            print("{:>7} {:>10} {:>7} {:>15.0f} {:>15.0f}".format(
+                engine, batch_size or "obj.save()", rows, inserted, updated))
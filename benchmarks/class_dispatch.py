@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Measures reload throughput with eval() and registry class dispatch.
+
+Usage: python3 -m benchmarks.class_dispatch [objects]  (default: 100000)
+"""
+import sys
+import time
+from models import classes
+# The model classes are imported for eval() to resolve their names.
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+
+def records(size):
+    """Return size (class name, dictionary) pairs of stored objects."""
+    names = ["Amenity", "City", "Place", "Review", "State", "User"]
+    pairs = []
+    for i in range(size):
+        o = classes[names[i % len(names)]]().to_dict()
+        pairs.append((o.pop("__class__"), o))
+    return pairs
+
+
+def rate(pairs, dispatch):
+    """Return the objects per second created through dispatch."""
+    start = time.perf_counter()
+    for name, o in pairs:
+        dispatch(name)(**o)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pairs = records(size)
+    print("{} objects".format(size))
+    print("eval:     {:10.0f} objects/s".format(rate(pairs, eval)))
+    print("registry: {:10.0f} objects/s".format(rate(pairs,
+                                                     classes.__getitem__)))
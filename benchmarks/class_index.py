@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""Compares a full scan of __objects with the per-class index.
+
+The scan reproduces the former FileStorage.all(cls), which compared the
+type of every stored object; the indexed path is FileStorage.all(cls).
+
+Usage: python3 -m benchmarks.class_index [objects]  (default: 100000)
+"""
+import sys
+import timeit
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from models.engine.file_storage import FileStorage
+
+
+def scan(objects, cls):
+    """Return the objects of cls found by a scan of objects."""
+    return {k: v for k, v in objects.items() if type(v) is cls}
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    classes = [Amenity, City, Place, Review, State, User]
+    FileStorage._FileStorage__objects = {}
+    storage = FileStorage()
+    for i in range(size):
+        storage.new(classes[i % len(classes)]())
+    objects = storage.all()
+    rounds = 50
+    t_scan = timeit.timeit(lambda: scan(objects, State), number=rounds)
+    t_index = timeit.timeit(lambda: storage.all(State), number=rounds)
+    print("{} objects, {} States".format(size, len(storage.all(State))))
+    print("scan:    {:10.3f} ms/call".format(t_scan / rounds * 1000))
+    print("indexed: {:10.6f} ms/call".format(t_index / rounds * 1000))
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""Measures the memory held by Places, with and without HBNB_FILE_COMPACT.
+
+Each layout runs in a fresh process that builds the Places from to_dict()
+records the way FileStorage.reload() does, one record at a time, and
+reports how much its peak RSS grew.
+
+Usage: python3 -m benchmarks.compact_memory [places]  (default: 1000000)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+BUILD = """
+import resource
+import sys
+import uuid
+from models.place import Place
+size = int(sys.argv[1])
+start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+places = []
+for i in range(size):
+    places.append(Place.from_dict({
+        "id": str(uuid.uuid4()), "__class__": "Place",
+        "created_at": "2024-04-24T12:12:33.271773",
+        "updated_at": "2024-04-24T12:12:33.271778",
+        "city_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()),
+        "name": "Place {}".format(i), "number_rooms": 3,
+        "max_guest": 6, "price_by_night": 120,
+        "latitude": 37.77, "longitude": -122.43}))
+end = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print((end - start) / 1024)
+"""
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "1000000"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    print("{} Places".format(size))
+    for name, compact in (("__dict__", "0"), ("__slots__", "1")):
+        out = subprocess.run([sys.executable, "-c", BUILD, size],
+                             env=dict(env, HBNB_FILE_COMPACT=compact),
+                             check=True, capture_output=True, text=True)
+        print("{:>10}: {:8.0f} MB".format(name, float(out.stdout)))
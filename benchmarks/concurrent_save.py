@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Measures the save throughput of processes writing the same store.
+
+Each writer process starts, then saves new States one at a time; the
+total saves per second (from the first save to the last, start-up
+excluded) are printed for an increasing number of writers, with the
+default FileStorage and in journaled mode, along with the number of
+States lost (which should be 0).
+
+Usage: python3 -m benchmarks.concurrent_save [saves] [writers ...]
+       (default: 200 saves per writer, 1 2 4 8 writers)
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.reload_memory import ROOT
+
+WRITER = """
+import sys
+import time
+from models.state import State
+sys.stdin.readline()
+start = time.time()
+for i in range(int(sys.argv[1])):
+    State(name="State").save()
+print(start, time.time())
+"""
+
+COUNT = """
+from models import storage
+from models.state import State
+print(len(storage.all(State)))
+"""
+
+
+def run(env, writers, saves):
+    """Return the saves per second of writers and the States lost."""
+    for name in ("file.json", "file.json.journal"):
+        if os.path.exists(name):
+            os.remove(name)
+    procs = [subprocess.Popen([sys.executable, "-c", WRITER, str(saves)],
+                              env=env, stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE)
+             for i in range(writers)]
+    time.sleep(1)
+    for proc in procs:
+        proc.stdin.write(b"\n")
+        proc.stdin.flush()
+    spans = [[float(t) for t in proc.communicate()[0].split()]
+             for proc in procs]
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    count = subprocess.run([sys.executable, "-c", COUNT], env=env,
+                           check=True, stdout=subprocess.PIPE).stdout
+    return writers * saves / elapsed, writers * saves - json.loads(count)
+
+
+if __name__ == "__main__":
+    saves = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    counts = [int(n) for n in sys.argv[2:]] or [1, 2, 4, 8]
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    print("{:>8} {:>8} {:>10} {:>6}".format("mode", "writers", "saves/s",
+                                            "lost"))
+    for mode, extra in (("full", {}), ("journal", {"HBNB_FILE_JOURNAL": "1"})):
+        for writers in counts:
+            print("{:>8} {:>8} {:>10.1f} {:>6}".format(
+                mode, writers, *run(dict(env, **extra), writers, saves)))
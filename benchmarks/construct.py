@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Measures the Places constructed per second from to_dict() records.
+
+"strptime" reproduces the former BaseModel.__init__, which generated an
+id and a datetime before parsing the ones of the record with strptime;
+"__init__" is the current constructor and "from_dict" the fast path
+used by FileStorage.reload().
+
+Usage: python3 -m benchmarks.construct [objects]  (default: 100000)
+"""
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+from models.place import Place
+
+
+def strptime_init(**kwargs):
+    """Build a Place the way the former BaseModel.__init__ did."""
+    obj = Place.__new__(Place)
+    obj.id = str(uuid4())
+    obj.created_at = obj.updated_at = datetime.utcnow()
+    for key, value in kwargs.items():
+        if key == "created_at" or key == "updated_at":
+            value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+        if key != "__class__" and hasattr(obj, key):
+            setattr(obj, key, value)
+    return obj
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    records = [Place(name="House", number_rooms=3).to_dict()
+               for i in range(size)]
+    for name, build in (("strptime", lambda o: strptime_init(**o)),
+                        ("__init__", lambda o: Place(**o)),
+                        ("from_dict", Place.from_dict)):
+        start = time.perf_counter()
+        for o in records:
+            build(o)
+        print("{:>10}: {:10.0f} objects/s".format(
+            name, size / (time.perf_counter() - start)))
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Profiles FileStorage.save() after changing one object.
+
+For each store size, one State is changed with State.save() and the
+next storage.save() is profiled: "to_dict" counts the objects encoded
+again, "cpu (ms)" is the process time of the save and "encode (ms)" the
+part of it spent encoding entries, the rest being the write of the
+(unchanged) entries to the snapshot file.
+
+Usage: python3 -m benchmarks.dirty_save [size ...]
+       (default sizes: 1000 10000 100000)
+"""
+import cProfile
+import os
+import pstats
+import sys
+import time
+import models
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+def profile_save():
+    """Return the to_dict calls, CPU ms and encoding ms of one save."""
+    profiler = cProfile.Profile()
+    start = time.process_time()
+    profiler.runcall(models.storage.save)
+    cpu = (time.process_time() - start) * 1000
+    stats = pstats.Stats(profiler).stats
+    calls, encode = 0, 0.0
+    for (path, line, name), (cc, nc, tt, ct, callers) in stats.items():
+        if name == "to_dict":
+            calls += nc
+        if name == "encode" and path.endswith("serializers.py"):
+            encode += ct * 1000
+    return calls, cpu, encode
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+    print("{:>9} {:>9} {:>10} {:>12}".format("objects", "to_dict",
+                                             "cpu (ms)", "encode (ms)"))
+    for size in sizes:
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+        FileStorage._FileStorage__objects = {}
+        states = [State(name="State") for i in range(size)]
+        for state in states:
+            models.storage.new(state)
+        models.storage.save()
+        states[0].name = "Changed"
+        models.storage.new(states[0])
+        print("{:>9} {:>9} {:>10.1f} {:>12.2f}".format(size, *profile_save()))
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""Measures the latency of one BaseModel.save() under each fsync policy.
+
+Every policy of HBNB_FILE_FSYNC is timed with the default FileStorage,
+which rewrites the snapshot on every save, and with the journaled mode
+(HBNB_FILE_JOURNAL=1). Saves are spaced by a short pause so that the
+interval policy flushes some of them only, the others being flushed
+by a timer at the end of the interval.
+
+Usage: python3 -m benchmarks.fsync_save [objects] [directory]
+       (default: 1000 objects, in a scratch directory under /tmp;
+       pass a directory on the disk to measure, as /tmp may be tmpfs)
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import models
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+
+POLICIES = ("never", "10", "always")
+
+
+def median_save(rounds):
+    """Return the median and maximum duration in ms of rounds saves."""
+    times = []
+    for i in range(rounds):
+        obj = BaseModel()
+        start = time.perf_counter()
+        obj.save()
+        times.append(time.perf_counter() - start)
+        time.sleep(0.002)
+    return statistics.median(times) * 1000, max(times) * 1000
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    if len(sys.argv) > 2:
+        os.chdir(tempfile.mkdtemp(prefix="hbnb_bench_", dir=sys.argv[2]))
+    print("{:>8} {:>8} {:>14} {:>14}".format("mode", "fsync", "median (ms)",
+                                             "max (ms)"))
+    for journal in ("0", "1"):
+        os.environ["HBNB_FILE_JOURNAL"] = journal
+        for policy in POLICIES:
+            os.environ["HBNB_FILE_FSYNC"] = policy
+            for name in ("file.json", "file.json.journal"):
+                if os.path.exists(name):
+                    os.remove(name)
+            FileStorage._FileStorage__objects = {}
+            for i in range(size):
+                models.storage.new(BaseModel())
+            models.storage.save()
+            median, worst = median_save(200)
+            print("{:>8} {:>8} {:>14.3f} {:>14.3f}".format(
+                "journal" if journal == "1" else "full", policy,
+                median, worst))
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Measures finding one object by id and counting objects in a large store.
+
+The store holds States only. For each engine, in a fresh process:
+"open" is the time to import models, "get" the median time of
+storage.get(State, id) for random ids, "count" the time of
+storage.count(State) and "count keys" of counting the States by
+splitting every key of all() (as the console's count did), then the
+median time of indexing all(State) (as the console did) and of looping
+over it for the id (as the /states/<id> route did).
+Engines: file.json, file.snapshot (memory-mapped) and SQLite.
+
+Usage: python3 -m benchmarks.get_count [objects] [lookups]
+       (default: 1000000 objects, 5 lookups; get runs 100 times as many)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import sys
+from models import storage
+from models.state import State
+for i in range(int(sys.argv[1])):
+    storage.new(State(id="{:07d}".format(i), name="State{}".format(i)))
+    if i % 50000 == 49999:
+        storage.save()
+storage.save()
+"""
+
+MEASURE = """
+import random
+import statistics
+import sys
+import time
+start = time.perf_counter()
+from models import storage
+from models.state import State
+opened = time.perf_counter() - start
+size, lookups = int(sys.argv[1]), int(sys.argv[2])
+ids = ["{:07d}".format(i) for i in random.sample(range(size), lookups * 101)]
+ids, others = ids[:lookups * 100], ids[lookups * 100:]
+
+
+def timed(find, ids):
+    times = []
+    for state_id in ids:
+        start = time.perf_counter()
+        assert find(state_id).id == state_id
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def scan(state_id):
+    for state in storage.all(State).values():
+        if state.id == state_id:
+            return state
+
+
+def count_keys():
+    return sum(1 for key in storage.all() if key.split(".")[0] == "State")
+
+
+results = [opened, timed(lambda i: storage.get(State, i), ids)]
+for count in (lambda: storage.count(State), count_keys):
+    start = time.perf_counter()
+    assert count() == size
+    results.append((time.perf_counter() - start) * 1000)
+results.append(timed(lambda i: storage.all(State)["State." + i], others))
+results.append(timed(scan, others))
+print(*results)
+"""
+
+ENGINES = (
+    ("json", {}),
+    ("snapshot", {"HBNB_FILE_FORMAT": "snapshot"}),
+    ("sqlite", {"HBNB_TYPE_STORAGE": "sqlite"}),
+)
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "1000000"
+    lookups = sys.argv[2] if len(sys.argv) > 2 else "5"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_ENV", "HBNB_SQLITE_PATH",
+                 "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT",
+                 "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    run(GENERATE, env, size)
+    run(GENERATE, dict(env, HBNB_TYPE_STORAGE="sqlite"), size)
+    subprocess.run([sys.executable, "-m", "models.engine.migrate",
+                    "snapshot"], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    print("{:>8} {:>9} {:>9} {:>10} {:>10} {:>13} {:>9}".format(
+        "engine", "open (s)", "get (ms)", "count (ms)",
+        "keys (ms)", "all[key] (ms)", "scan (ms)"))
+    for engine, extra in ENGINES:
+        opened, get, count, keys, index, scan = map(
+            float, run(MEASURE, dict(env, **extra), size, lookups))
+        print("{:>8} {:>9.2f} {:>9.4f} {:>10.3f} {:>10.1f} {:>13.4f} "
+              "{:>9.1f}".format(engine, opened, get, count, keys, index,
+                                scan))
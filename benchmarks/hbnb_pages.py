@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""Measures GET /hbnb and GET /states when the store is large.
+
+The store holds Places (each with one Review and one Amenity), 50
+States with 500 Cities and 50 Amenities for /hbnb, then as many States
+as Places for /states. For each engine and route, in a fresh process,
+the median time of a request and the size of its response are printed,
+for the first page (of the default 50 objects) and the last page.
+
+Usage: python3 -m benchmarks.hbnb_pages [places] [requests]
+       (default: 20000 places, 10 requests)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import random
+import sys
+from os import getenv
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+size = int(sys.argv[1])
+user = User(email="a@b.c", password="pw", first_name="Ann", last_name="Lee")
+storage.new(user)
+states = [State(name="State{}".format(i)) for i in range(50)]
+cities = [City(name="City{}".format(i), state_id=random.choice(states).id)
+          for i in range(500)]
+amenities = [Amenity(name="Amenity{}".format(i)) for i in range(50)]
+for obj in states + cities + amenities:
+    storage.new(obj)
+storage.save()
+for i in range(size):
+    place = Place(name="Place{}".format(i), user_id=user.id,
+                  city_id=random.choice(cities).id, description="Nice " * 20)
+    storage.new(place)
+    if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+        place.amenities.append(random.choice(amenities))
+    else:
+        place.amenities = random.choice(amenities)
+    storage.new(Review(place_id=place.id, user_id=user.id, text="Great"))
+    if i % 10000 == 9999:
+        storage.save()
+storage.save()
+"""
+
+STATES = """
+import sys
+from models import storage
+from models.state import State
+for i in range(int(sys.argv[1])):
+    storage.new(State(name="Other{}".format(i)))
+storage.save()
+"""
+
+MEASURE = """
+import importlib
+import statistics
+import sys
+import time
+module, url = sys.argv[3:]
+client = importlib.import_module("web_flask." + module).app.test_client()
+results = []
+for query in ("", "?page=" + sys.argv[2]):
+    times = []
+    for i in range(int(sys.argv[1])):
+        start = time.perf_counter()
+        response = client.get(url + query)
+        times.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    results += [statistics.median(times) * 1000, len(response.data) / 1024]
+print(*results)
+"""
+
+ENGINES = (
+    ("json", {}),
+    ("sqlite", {"HBNB_TYPE_STORAGE": "sqlite"}),
+)
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "20000"
+    requests = sys.argv[2] if len(sys.argv) > 2 else "10"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_ENV", "HBNB_SQLITE_PATH",
+                 "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT",
+                 "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    last = str(int(size) // 50 + 1)
+    print("{:>7} {:>7} {:>12} {:>10} {:>12} {:>10}".format(
+        "engine", "route", "first (ms)", "(KB)", "last (ms)", "(KB)"))
+    for engine, extra in ENGINES:
+        env_engine = dict(env, **extra)
+        run(GENERATE, env_engine, size)
+        for module, route in (("100-hbnb", "/hbnb"), ("9-states", "/states")):
+            if route == "/states":
+                run(STATES, env_engine, size)
+            print("{:>7} {:>7} {:>12.1f} {:>10.1f} {:>12.1f} {:>10.1f}"
+                  .format(engine, route, *map(float, run(
+                      MEASURE, env_engine, requests, last, module, route))))
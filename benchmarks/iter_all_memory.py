@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Measures the peak RSS of reading every row of a large places table.
+
+The SQLite store holds Places. Each reader runs in a fresh process:
+"all()" counts storage.all(Place), "iter_all()" counts the objects of
+storage.iter_all(Place), "print(list)" prints all(Place) as the console's
+all command did and "console all" runs the command, which now prints
+the objects of iter_all() one at a time (both to /dev/null).
+
+Usage: python3 -m benchmarks.iter_all_memory [places]
+       (default: 1000000 places)
+"""
+import os
+import subprocess
+import sys
+import time
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import sys
+from models import storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+state, user = State(name="California"), User(email="a@b.c", password="pw")
+city = City(name="Napa", state_id=state.id)
+storage.bulk_new([state, city, user])
+storage.bulk_new((Place(name="House{}".format(i), city_id=city.id,
+                        user_id=user.id, description="A nice place " * 4,
+                        number_rooms=3, price_by_night=120)
+                  for i in range(int(sys.argv[1]))), batch_size=10000)
+"""
+
+READERS = {
+    "all()": """
+from models import storage
+from models.place import Place
+count = len(storage.all(Place))
+""",
+    "iter_all()": """
+from models import storage
+from models.place import Place
+count = sum(1 for place in storage.iter_all(Place))
+""",
+    "print(list)": """
+import sys
+from models import storage
+from models.place import Place
+sys.stdout = open(os.devnull, "w")
+objs = storage.all(Place)
+print([objs[key].__str__() for key in objs])
+count = len(objs)
+""",
+    "console all": """
+import sys
+from console import HBNBCommand
+from models import storage
+sys.stdout = open(os.devnull, "w")
+HBNBCommand().onecmd("all Place")
+count = storage.count("Place")
+""",
+}
+
+REPORT = """
+import resource
+sys.stdout = sys.__stdout__
+print(count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "1000000"
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_TYPE_STORAGE="sqlite")
+    for name in ("HBNB_ENV", "HBNB_SQLITE_PATH"):
+        env.pop(name, None)
+    subprocess.run([sys.executable, "-c", GENERATE, size],
+                   env=dict(env, HBNB_ENV="test"), check=True)
+    for name, code in READERS.items():
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", "import os, sys" + code +
+                              REPORT], env=env, check=True,
+                             stdout=subprocess.PIPE, universal_newlines=True)
+        count, rss = out.stdout.split()
+        print("{:>12}: {} objects, peak RSS {:.0f} MB, {:.1f} s".format(
+            name, count, int(rss) / 1024, time.perf_counter() - start))
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""Measures the latency of one BaseModel.save() as the store grows.
+
+Compares the default FileStorage, which rewrites file.json on every
+save, with the journaled mode (HBNB_FILE_JOURNAL=1).
+
+Usage: python3 -m benchmarks.journal_save [size ...]
+       (default sizes: 1000 10000 100000; pass 1000000 for 1M objects)
+"""
+import os
+import statistics
+import sys
+import time
+import models
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+
+
+def fill(size):
+    """Reset the storage to size saved objects."""
+    for name in ("file.json", "file.json.journal"):
+        if os.path.exists(name):
+            os.remove(name)
+    FileStorage._FileStorage__objects = {}
+    for i in range(size):
+        models.storage.new(BaseModel())
+    models.storage.save()
+
+
+def median_save(rounds):
+    """Return the median duration in ms of rounds BaseModel.save()."""
+    times = []
+    for i in range(rounds):
+        obj = BaseModel()
+        start = time.perf_counter()
+        obj.save()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+    print("{:>9} {:>14} {:>14}".format("objects", "full (ms)",
+                                       "journal (ms)"))
+    for size in sizes:
+        os.environ.pop("HBNB_FILE_JOURNAL", None)
+        fill(size)
+        full = median_save(max(3, 30000 // size))
+        os.environ["HBNB_FILE_JOURNAL"] = "1"
+        fill(size)
+        journal = median_save(500)
+        print("{:>9} {:>14.3f} {:>14.3f}".format(size, full, journal))
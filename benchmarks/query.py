@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""Measures query() against filtering all(Place) in Python.
+
+The store holds Places spread over 1000 Cities. The query is "the 20
+cheapest Places under 100 a night in one City" (city_id=X,
+price_by_night__lt=100, order_by="price_by_night", limit=20), and a
+page of all Places sorted by name (order_by="name", limit=20,
+offset=1000). For each engine, in a fresh process, the median time of
+storage.query() and of the same done on all(Place) is printed.
+
+Usage: python3 -m benchmarks.query [objects] [queries]
+       (default: 100000 objects, 20 queries)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import random
+import sys
+from models import storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+state, user = State(name="California"), User(email="a@b.c", password="pw")
+cities = [City(name="City{}".format(i), state_id=state.id)
+          for i in range(1000)]
+for obj in [state, user] + cities:
+    storage.new(obj)
+storage.save()
+for i in range(int(sys.argv[1])):
+    storage.new(Place(name="Place{}".format(i), user_id=user.id,
+                      city_id=random.choice(cities).id,
+                      price_by_night=random.randrange(300)))
+    if i % 50000 == 49999:
+        storage.save()
+storage.save()
+"""
+
+MEASURE = """
+import random
+import statistics
+import sys
+import time
+from models import storage
+from models.city import City
+from models.place import Place
+cities = [city.id for city in storage.all(City).values()]
+
+
+def timed(query):
+    times = []
+    for i in range(int(sys.argv[1])):
+        city_id = random.choice(cities)
+        start = time.perf_counter()
+        query(city_id)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def python_city(city_id):
+    places = [p for p in storage.all(Place).values()
+              if p.city_id == city_id and p.price_by_night < 100]
+    return sorted(places, key=lambda p: p.price_by_night)[:20]
+
+
+def python_page(city_id):
+    return sorted(storage.all(Place).values(),
+                  key=lambda p: p.name)[1000:1020]
+
+
+storage.all(Place)
+print(timed(lambda i: storage.query(Place, city_id=i,
+                                    price_by_night__lt=100,
+                                    order_by="price_by_night", limit=20)),
+      timed(python_city),
+      timed(lambda i: storage.query(Place, order_by="name", limit=20,
+                                    offset=1000)),
+      timed(python_page))
+"""
+
+ENGINES = (
+    ("json", {}),
+    ("sqlite", {"HBNB_TYPE_STORAGE": "sqlite"}),
+)
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    queries = sys.argv[2] if len(sys.argv) > 2 else "20"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_ENV", "HBNB_SQLITE_PATH",
+                 "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT",
+                 "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    print("{:>7} {:>16} {:>17} {:>16} {:>17}".format(
+        "engine", "city query (ms)", "city all() (ms)", "page query (ms)",
+        "page all() (ms)"))
+    for engine, extra in ENGINES:
+        run(GENERATE, dict(env, **extra), size)
+        print("{:>7} {:>16.2f} {:>17.2f} {:>16.2f} {:>17.2f}".format(
+            engine, *map(float, run(MEASURE, dict(env, **extra), queries))))
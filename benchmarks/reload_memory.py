@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Measures the peak RSS of loading a large file.json.
+
+Each loader runs in a fresh process: "json.load" is the former reload()
+(parse the whole file, then create the objects), "streaming" is the
+current FileStorage.reload().
+
+Usage: python3 -m benchmarks.reload_memory [megabytes]  (default: 50)
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADERS = {
+    "json.load": """
+import json
+from models.place import Place
+objects = {}
+with open("file.json", encoding="utf-8") as f:
+    for key, o in json.load(f).items():
+        del o["__class__"]
+        objects[key] = Place(**o)
+""",
+    "streaming": """
+from models import storage
+objects = storage.all()
+""",
+}
+
+REPORT = """
+import resource
+print(len(objects), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def generate(megabytes):
+    """Write a file.json of about megabytes MB of Places."""
+    size = 0
+    with open("file.json", "w", encoding="utf-8") as f:
+        f.write("{")
+        sep = "\n"
+        while size < megabytes * 1024 * 1024:
+            place_id = str(uuid.uuid4())
+            record = {"id": place_id, "__class__": "Place",
+                      "created_at": "2024-04-24T12:12:33.271773",
+                      "updated_at": "2024-04-24T12:12:33.271778",
+                      "city_id": str(uuid.uuid4()),
+                      "user_id": str(uuid.uuid4()),
+                      "name": "Place " + place_id[:8],
+                      "description": "A nice place to stay " * 4,
+                      "number_rooms": 3, "number_bathrooms": 1,
+                      "max_guest": 6, "price_by_night": 120,
+                      "latitude": 37.77, "longitude": -122.43}
+            line = sep + json.dumps("Place." + place_id) + ": " + \
+                json.dumps(record)
+            f.write(line)
+            size += len(line)
+            sep = ",\n"
+        f.write("\n}\n")
+
+
+if __name__ == "__main__":
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    generate(megabytes)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    print("file.json: {:.0f} MB".format(os.path.getsize("file.json") / 2**20))
+    for name, code in LOADERS.items():
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code + REPORT], env=env,
+                             check=True, capture_output=True, text=True)
+        count, rss = out.stdout.split()
+        print("{:>10}: {} objects, peak RSS {:.0f} MB, {:.1f} s".format(
+            name, count, int(rss) / 1024, time.perf_counter() - start))
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Measures the latency of GET /states when the store is large.
+
+Every request of web_flask/9-states.py ends with storage.close(). The
+store holds mostly Reviews and Places and one State; the median time of
+a request is printed for the former close() (a full reload() after each
+request), then for the current close() with the single file, sharded
+and memory-mapped snapshot formats: "unchanged" when no file changed
+between requests, "changed" when the State file was touched before
+each request (as another process saving would), so that close() reads
+it again.
+
+Usage: python3 -m benchmarks.request_latency [objects] [requests]
+       (default: 50000 objects, 50 requests)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+from benchmarks.sharded import GENERATE
+
+REQUESTS = """
+import importlib
+import os
+import statistics
+import sys
+import time
+from models.engine.file_storage import FileStorage
+if sys.argv[2] == "reload":
+    FileStorage.close = FileStorage.reload
+client = importlib.import_module("web_flask.9-states").app.test_client()
+client.get("/states")
+for touch in (None, sys.argv[3]):
+    times = []
+    for i in range(int(sys.argv[1])):
+        if touch:
+            os.utime(touch)
+        start = time.perf_counter()
+        assert client.get("/states").status_code == 200
+        times.append(time.perf_counter() - start)
+    print(statistics.median(times) * 1000)
+"""
+
+MODES = (
+    ("reload", {}, "file.json"),
+    ("single", {}, "file.json"),
+    ("sharded", {"HBNB_FILE_LAYOUT": "sharded"}, "file_storage/State.json"),
+    ("snapshot", {"HBNB_FILE_FORMAT": "snapshot"}, "file.snapshot"),
+)
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "50000"
+    requests = sys.argv[2] if len(sys.argv) > 2 else "50"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY",
+                 "HBNB_FILE_FORMAT", "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    subprocess.run([sys.executable, "-c", GENERATE, size], env=env,
+                   check=True)
+    for fmt, layout in (("json", "sharded"), ("snapshot", "single")):
+        subprocess.run([sys.executable, "-m", "models.engine.migrate", fmt,
+                        layout], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+    print("{:>9} {:>15} {:>13}".format("mode", "unchanged (ms)",
+                                       "changed (ms)"))
+    for mode, extra, touched in MODES:
+        out = subprocess.run([sys.executable, "-c", REQUESTS, requests, mode,
+                              touched], env=dict(env, **extra), check=True,
+                             stdout=subprocess.PIPE,
+                             universal_newlines=True).stdout
+        print("{:>9} {:>15.2f} {:>13.2f}".format(
+            mode, *(float(t) for t in out.split())))
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""Measures the page and relationship queries before and after the
+schema migrations.
+
+The SQLite store holds States with 4 Cities each, Places in those
+Cities with a Review each, and 50 Amenities linked to the Places. Its
+indexes are then dropped, as in a database created before they were
+declared (version 0). In fresh processes, the median time of each
+query is printed before and after "python3 -m models.engine.migrate
+schema upgrade", along with the time of the upgrade.
+
+Usage: python3 -m benchmarks.schema_indexes [places] [runs]
+       (default: 200000 places, 20 runs)
+"""
+import os
+import subprocess
+import sys
+import time
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import sys
+from models import storage
+from models.amenity import Amenity
+from models.base_model import Base
+from models.city import City
+from models.engine import schema
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+size = int(sys.argv[1])
+user = User(email="a@b.c", password="pw")
+amenities = [Amenity(name="Amenity{}".format(i)) for i in range(50)]
+storage.bulk_new([user] + amenities)
+
+
+def objects():
+    for i in range(size // 10):
+        state = State(name="State{:06d}".format(i))
+        yield state
+        for j in range(4):
+            yield City(name="City{}".format(j), state_id=state.id)
+
+
+cities = []
+for obj in objects():
+    if isinstance(obj, City):
+        cities.append(obj.id)
+    storage.new(obj)
+storage.save()
+storage.close()
+
+
+def places():
+    for i in range(size):
+        place = Place(name="Place{:07d}".format(size - i), user_id=user.id,
+                      city_id=cities[i % len(cities)])
+        place.amenities.append(amenities[i % 50])
+        yield place
+        yield Review(text="Nice", place_id=place.id, user_id=user.id)
+
+
+storage.bulk_new(places(), batch_size=10000)
+with storage.engine.begin() as connection:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(connection)
+    connection.execute(schema.schema_version.delete())
+"""
+
+MEASURE = """
+import statistics
+import sys
+import time
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+runs = int(sys.argv[1])
+states = storage.count(State)
+state = storage.query(State, limit=1, offset=states // 2)[0]
+city = storage.query(City, state_id=state.id)[0]
+place = storage.query(Place, city_id=city.id)[0]
+amenity = storage.query(Amenity, limit=1)[0]
+queries = (
+    lambda: storage.query(State, order_by=["name", "id"], limit=50),
+    lambda: storage.query(State, order_by=["name", "id"], limit=50,
+                          offset=states - 50),
+    lambda: storage.query(Place, order_by=["name", "id"], limit=50),
+    lambda: storage.query(City, state_id=state.id, order_by="name"),
+    lambda: storage.query(Place, city_id=city.id),
+    lambda: storage.query(Review, place_id=place.id),
+    lambda: len(storage.get(Amenity, amenity.id).place_amenities),
+)
+times = []
+for query in queries:
+    samples = []
+    for i in range(runs):
+        storage.close()
+        start = time.perf_counter()
+        query()
+        samples.append(time.perf_counter() - start)
+    times.append(statistics.median(samples) * 1000)
+print(*times)
+"""
+
+QUERIES = ("states page 1", "states last page", "places page 1",
+           "cities of a state", "places of a city", "reviews of a place",
+           "places of an amenity")
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "200000"
+    runs = sys.argv[2] if len(sys.argv) > 2 else "20"
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_TYPE_STORAGE="sqlite")
+    for name in ("HBNB_ENV", "HBNB_SQLITE_PATH"):
+        env.pop(name, None)
+    run(GENERATE, dict(env, HBNB_ENV="test"), size)
+    before = run(MEASURE, env, runs)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "models.engine.migrate", "schema",
+                    "upgrade"], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    upgraded = time.perf_counter() - start
+    after = run(MEASURE, env, runs)
+    print("{:>20} {:>12} {:>12}".format("query", "v0 (ms)", "v2 (ms)"))
+    for name, old, new in zip(QUERIES, before, after):
+        print("{:>20} {:>12.3f} {:>12.3f}".format(name, float(old),
+                                                  float(new)))
+    print("upgrade: {:.1f} s".format(upgraded))
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Compares the snapshot formats of FileStorage.
+
+For each format, saves then reloads the same Places and prints the
+save and reload throughput and the size of the snapshot file. "lazy"
+is the reload throughput with HBNB_FILE_LAZY=1, i.e. of decoding alone.
+
+Usage: python3 -m benchmarks.serializers [objects]  (default: 100000)
+"""
+import gc
+import os
+import sys
+import time
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import SERIALIZERS
+from models.place import Place
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    FileStorage._FileStorage__objects = {}
+    storage = FileStorage()
+    for i in range(size):
+        storage.new(Place(name="House", description="A nice place " * 4,
+                          city_id="c", user_id="u", number_rooms=3,
+                          latitude=37.77, amenity_ids=["a", "b"]))
+    objects = FileStorage._FileStorage__objects
+    for fmt in SERIALIZERS:
+        with patch.dict(os.environ, {"HBNB_FILE_FORMAT": fmt}):
+            FileStorage._FileStorage__objects = objects
+            gc.collect()
+            start = time.perf_counter()
+            path = storage.export()
+            saved = time.perf_counter() - start
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            storage.reload()
+            loaded = time.perf_counter() - start
+            FileStorage._FileStorage__objects = {}
+            with patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+                start = time.perf_counter()
+                storage.reload()
+                decoded = time.perf_counter() - start
+        print("{:>6}: save {:7.0f}/s, reload {:7.0f}/s, lazy {:7.0f}/s, "
+              "{:5.1f} MB".format(fmt, size / saved, size / loaded,
+                                  size / decoded,
+                                  os.path.getsize(path) / 1024 / 1024))
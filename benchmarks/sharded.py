@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""Compares the single file and sharded layouts of FileStorage.
+
+The store holds mostly Reviews and Places, 50 Amenities and one State.
+For each layout, in a fresh process: "all(Amenity)" is the time to start
+and list the Amenities, "save State"/"save Review" the median time to
+save one changed State/Review.
+
+Usage: python3 -m benchmarks.sharded [objects]  (default: 100000)
+"""
+import os
+import subprocess
+import sys
+import time
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import sys
+from models import storage
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+size = int(sys.argv[1])
+state, user = State(name="California"), User(email="a@b.c", password="pw")
+for obj in [state, user] + [Amenity(name="Wifi") for i in range(50)]:
+    storage.new(obj)
+for i in range(size // 5):
+    place = Place(name="House", user_id=user.id, description="Nice " * 20)
+    storage.new(place)
+    for j in range(4):
+        storage.new(Review(place_id=place.id, user_id=user.id,
+                           text="Great stay " * 10))
+storage.save()
+"""
+
+LIST = """
+from models import storage
+from models.amenity import Amenity
+print(len(storage.all(Amenity)))
+"""
+
+SAVE = """
+import statistics
+import sys
+import time
+import models
+obj = next(iter(models.storage.all(models.classes[sys.argv[1]]).values()))
+times = []
+for i in range(20):
+    obj.name = str(i)
+    start = time.perf_counter()
+    obj.save()
+    times.append(time.perf_counter() - start)
+print(statistics.median(times) * 1000)
+"""
+
+
+def run(code, env, *args):
+    """Return the duration in seconds and the output of code."""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                         check=True, stdout=subprocess.PIPE,
+                         universal_newlines=True).stdout
+    return time.perf_counter() - start, out.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_FILE_LAYOUT="single")
+    env.pop("HBNB_TYPE_STORAGE", None)
+    run(GENERATE, env, size)
+    subprocess.run([sys.executable, "-m", "models.engine.migrate", "json",
+                    "sharded"], env=env, check=True, stdout=subprocess.DEVNULL)
+    print("{:>8} {:>16} {:>16} {:>17}".format(
+        "layout", "all(Amenity) (s)", "save State (ms)", "save Review (ms)"))
+    for layout in ("single", "sharded"):
+        env["HBNB_FILE_LAYOUT"] = layout
+        listed = run(LIST, env)[0]
+        state = float(run(SAVE, env, "State")[1][0])
+        review = float(run(SAVE, env, "Review")[1][0])
+        print("{:>8} {:>16.2f} {:>16.1f} {:>17.1f}".format(
+            layout, listed, state, review))
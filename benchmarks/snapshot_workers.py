@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Measures the aggregate memory of Flask workers serving /states_list.
+
+Like gunicorn workers without --preload, each of the workers imports
+web_flask/7-states_list.py in its own process and serves one request.
+Once they all have, their Rss, Pss (shared pages divided among the
+processes mapping them) and private memory are summed, for file.json
+loaded eagerly, file.json with HBNB_FILE_LAZY=1 and the memory-mapped
+file.snapshot (HBNB_FILE_FORMAT=snapshot).
+
+Usage: python3 -m benchmarks.snapshot_workers [objects] [workers]
+       (default: 100000 objects, 8 workers)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+from benchmarks.sharded import GENERATE
+
+WORKER = """
+import importlib
+import sys
+app = importlib.import_module("web_flask.7-states_list").app
+assert app.test_client().get("/states_list").status_code == 200
+print("ready", flush=True)
+sys.stdin.readline()
+stats = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        fields = line.split()
+        if fields[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+            stats[fields[0]] = int(fields[1])
+print(stats["Rss:"], stats["Pss:"],
+      stats["Private_Clean:"] + stats["Private_Dirty:"])
+"""
+
+
+def measure(env, workers):
+    """Return the summed Rss, Pss and private memory in MB of workers."""
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER], env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              universal_newlines=True)
+             for i in range(workers)]
+    for proc in procs:
+        assert proc.stdout.readline().strip() == "ready"
+    totals = [0, 0, 0]
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+        for i, value in enumerate(proc.stdout.readline().split()):
+            totals[i] += int(value) / 1024
+        proc.wait()
+    return totals
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY",
+                 "HBNB_FILE_FORMAT"):
+        env.pop(name, None)
+    subprocess.run([sys.executable, "-c", GENERATE, size], env=env,
+                   check=True)
+    subprocess.run([sys.executable, "-m", "models.engine.migrate",
+                    "snapshot"], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    print("{:>9} {:>10} {:>10} {:>13}".format("mode", "Rss (MB)", "Pss (MB)",
+                                              "private (MB)"))
+    for mode, extra in (("eager", {}), ("lazy", {"HBNB_FILE_LAZY": "1"}),
+                        ("snapshot", {"HBNB_FILE_FORMAT": "snapshot"})):
+        print("{:>9} {:>10.1f} {:>10.1f} {:>13.1f}".format(
+            mode, *measure(dict(env, **extra), workers)))
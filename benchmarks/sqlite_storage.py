@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""Compares FileStorage with DBStorage on a local SQLite database.
+
+The store holds States with 9 Cities each. For each engine, in fresh
+processes: "insert" is the time to create the objects and save them,
+"open" the time to import models (FileStorage reads file.json then),
+"lookup" the mean time to find a State by id through all(State), and
+"traverse" the time to count the Cities of every State through the
+State.cities relationship.
+
+Usage: python3 -m benchmarks.sqlite_storage [objects] [lookups]
+       (default: 100000 objects, 100 lookups)
+"""
+import os
+import subprocess
+import sys
+from benchmarks.reload_memory import ROOT
+
+INSERT = """
+import sys
+import time
+start = time.perf_counter()
+from models import storage
+from models.city import City
+from models.state import State
+for i in range(int(sys.argv[1]) // 10):
+    state = State(name="State{}".format(i))
+    storage.new(state)
+    for j in range(9):
+        storage.new(City(name="City{}".format(j), state_id=state.id))
+storage.save()
+print(time.perf_counter() - start)
+"""
+
+READ = """
+import random
+import sys
+import time
+start = time.perf_counter()
+from models import storage
+from models.state import State
+opened = time.perf_counter() - start
+ids = random.sample([s.id for s in storage.all(State).values()],
+                    int(sys.argv[1]))
+start = time.perf_counter()
+for state_id in ids:
+    assert storage.all(State)["State." + state_id].id == state_id
+lookup = (time.perf_counter() - start) / len(ids)
+start = time.perf_counter()
+cities = sum(len(state.cities) for state in storage.all(State).values())
+traverse = time.perf_counter() - start
+print(opened, lookup * 1000, traverse, cities)
+"""
+
+ENGINES = (
+    ("file", {}),
+    ("sqlite", {"HBNB_TYPE_STORAGE": "sqlite"}),
+)
+
+
+def run(code, env, *args):
+    """Return the output of code run in a fresh process."""
+    return subprocess.run([sys.executable, "-c", code] + list(args), env=env,
+                          check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+if __name__ == "__main__":
+    size = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    lookups = sys.argv[2] if len(sys.argv) > 2 else "100"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_ENV", "HBNB_SQLITE_PATH",
+                 "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT",
+                 "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    print("{:>7} {:>11} {:>9} {:>12} {:>13}".format(
+        "engine", "insert (s)", "open (s)", "lookup (ms)", "traverse (s)"))
+    for engine, extra in ENGINES:
+        inserted = float(run(INSERT, dict(env, **extra), size)[0])
+        opened, lookup, traverse, cities = run(READ, dict(env, **extra),
+                                               lookups)
+        assert int(cities) == int(size) // 10 * 9
+        print("{:>7} {:>11.2f} {:>9.2f} {:>12.2f} {:>13.2f}".format(
+            engine, inserted, float(opened), float(lookup), float(traverse)))
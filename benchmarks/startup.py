@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Measures the start time of console.py against the size of file.json.
+
+Each run imports console in a fresh process, which loads the storage,
+then shows one State, once eagerly and once with HBNB_FILE_LAZY=1.
+
+Usage: python3 -m benchmarks.startup [megabytes ...]  (default: 5 20 50)
+"""
+import os
+import subprocess
+import sys
+import time
+from benchmarks.reload_memory import ROOT, generate
+
+SHOW = """
+import console
+from models.state import State
+from models import storage
+state = State(name="California")
+storage.new(state)
+console.HBNBCommand().onecmd("show State " + state.id)
+"""
+
+
+def run(env):
+    """Return the duration in seconds of SHOW in a fresh process."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", SHOW], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [5, 20, 50]
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    print("{:>8} {:>10} {:>10}".format("MB", "eager (s)", "lazy (s)"))
+    for megabytes in sizes:
+        generate(megabytes)
+        eager = run(dict(env, HBNB_FILE_LAZY="0"))
+        lazy = run(dict(env, HBNB_FILE_LAZY="1"))
+        print("{:>8} {:>10.2f} {:>10.2f}".format(megabytes, eager, lazy))
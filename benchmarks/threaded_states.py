@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""Measures GET /states on a threaded server with concurrent clients.
+
+The store holds States. The 9-states app is served by a threaded
+werkzeug server (one thread, hence one DBStorage session, per request)
+in a fresh process; for each number of client threads, the requests
+completed per second over a few seconds, the median latency and the
+failed requests (errors or wrong pages) are printed.
+
+The engine is SQLite by default, or MySQL with 'db' and the
+HBNB_MYSQL_* variables of the environment (the database is emptied).
+The pool holds as many connections as the most client threads.
+
+Usage: python3 -m benchmarks.threaded_states [engine] [states] [seconds]
+       (default: sqlite, 10000 states, 5 seconds per run)
+"""
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from benchmarks.reload_memory import ROOT
+
+GENERATE = """
+import sys
+from models import storage
+from models.state import State
+for i in range(int(sys.argv[1])):
+    storage.new(State(name="State{}".format(i)))
+storage.save()
+"""
+
+SERVE = """
+import importlib
+from werkzeug.serving import make_server
+app = importlib.import_module("web_flask.9-states").app
+server = make_server("127.0.0.1", 0, app, threaded=True)
+print(server.port, flush=True)
+server.serve_forever()
+"""
+
+WORKERS = (1, 2, 4, 8, 16)
+
+
+def load(url, workers, seconds):
+    """Return the requests, latencies and failures of workers clients."""
+    latencies, failures = [], []
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url) as response:
+                    ok = b"<LI>" in response.read()
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures.append(url)
+    threads = [threading.Thread(target=client) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), latencies, len(failures)
+
+
+if __name__ == "__main__":
+    engine = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+    size = sys.argv[2] if len(sys.argv) > 2 else "10000"
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_TYPE_STORAGE=engine,
+               HBNB_MYSQL_POOL_SIZE=str(max(WORKERS)))
+    for name in ("HBNB_ENV", "HBNB_SQLITE_PATH", "HBNB_FILE_LAYOUT",
+                 "HBNB_FILE_LAZY", "HBNB_FILE_FORMAT", "HBNB_FILE_JOURNAL"):
+        env.pop(name, None)
+    subprocess.run([sys.executable, "-c", GENERATE, size],
+                   env=dict(env, HBNB_ENV="test"), check=True)
+    server = subprocess.Popen([sys.executable, "-c", SERVE], env=env,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL,
+                              universal_newlines=True)
+    try:
+        url = "http://127.0.0.1:{}/states".format(
+            server.stdout.readline().strip())
+        load(url, 1, 1)
+        print("{:>7} {:>10} {:>12} {:>8}".format(
+            "threads", "requests/s", "median (ms)", "failed"))
+        for workers in WORKERS:
+            done, latencies, failed = load(url, workers, seconds)
+            print("{:>7} {:>10.1f} {:>12.1f} {:>8}".format(
+                workers, done / seconds,
+                statistics.median(latencies) * 1000 if latencies else 0,
+                failed))
+    finally:
+        server.terminate()
+        server.wait()
@@ -1,31 +1,16 @@
 #!/usr/bin/python3
 """Defines the HBNB console."""
 import cmd
+from ast import literal_eval
 from shlex import split
-from models import storage
+from models import storage, classes
 from datetime import datetime
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
 
 
 class HBNBCommand(cmd.Cmd):
     """Defines the AirBnB command interpreter."""
 
     prompt = "(hbnb) "
-    __classes = {
-        "BaseModel",
-        "User",
-        "State",
-        "City",
-        "Amenity",
-        "Place",
-        "Review"
-    }
 
     def emptyline(self):
         """Ignore empty spaces."""
@@ -48,6 +33,8 @@ class HBNBCommand(cmd.Cmd):
             if not line:
                 raise SyntaxError()
             my_list = line.split(" ")
+            if my_list[0] not in classes:
+                raise NameError()
 
             kwargs = {}
             for i in range(1, len(my_list)):
@@ -56,15 +43,15 @@ class HBNBCommand(cmd.Cmd):
                     value = value.strip('"').replace("_", " ")
                 else:
                     try:
-                        value = eval(value)
-                    except (SyntaxError, NameError):
+                        value = literal_eval(value)
+                    except (SyntaxError, ValueError):
                         continue
                 kwargs[key] = value
 
             if kwargs == {}:
-                obj = eval(my_list[0])()
+                obj = classes[my_list[0]]()
             else:
-                obj = eval(my_list[0])(**kwargs)
+                obj = classes[my_list[0]](**kwargs)
                 storage.new(obj)
             print(obj.id)
             obj.save()
@@ -86,16 +73,14 @@ class HBNBCommand(cmd.Cmd):
             if not line:
                 raise SyntaxError()
             my_list = line.split(" ")
-            if my_list[0] not in self.__classes:
+            if my_list[0] not in classes:
                 raise NameError()
             if len(my_list) < 2:
                 raise IndexError()
-            objects = storage.all()
-            key = my_list[0] + '.' + my_list[1]
-            if key in objects:
-                print(objects[key])
-            else:
+            obj = storage.get(my_list[0], my_list[1])
+            if obj is None:
                 raise KeyError()
+            print(obj)
         except SyntaxError:
             print("** class name missing **")
         except NameError:
@@ -117,17 +102,15 @@ class HBNBCommand(cmd.Cmd):
             if not line:
                 raise SyntaxError()
             my_list = line.split(" ")
-            if my_list[0] not in self.__classes:
+            if my_list[0] not in classes:
                 raise NameError()
             if len(my_list) < 2:
                 raise IndexError()
-            objects = storage.all()
-            key = my_list[0] + '.' + my_list[1]
-            if key in objects:
-                del objects[key]
-                storage.save()
-            else:
+            obj = storage.get(my_list[0], my_list[1])
+            if obj is None:
                 raise KeyError()
+            storage.delete(obj)
+            storage.save()
         except SyntaxError:
             print("** class name missing **")
         except NameError:
@@ -138,23 +121,44 @@ class HBNBCommand(cmd.Cmd):
             print("** no instance found **")
 
     def do_all(self, line):
-        """Usage: all or all <class> or <class>.all()
+        """Usage: all or all <class> [<key>=<value> ...] or <class>.all()
         Display string representations of all instances of a given class.
-        If no class is specified, displays all instantiated objects."""
+        If no class is specified, displays all instantiated objects.
+        The keys order_by, limit and offset sort and page the instances,
+        other keys filter them, e.g.
+        all Place price_by_night__lt=100 order_by=-name,id limit=10"""
         if not line:
-            o = storage.all()
-            print([o[k].__str__() for k in o])
+            self.print_list(storage.iter_all())
             return
         try:
             args = line.split(" ")
-            if args[0] not in self.__classes:
+            if args[0] not in classes:
                 raise NameError()
+            if len(args) == 1:
+                self.print_list(storage.iter_all(classes[args[0]]))
+                return
 
-            o = storage.all(eval(args[0]))
-            print([o[k].__str__() for k in o])
+            kwargs = {}
+            for arg in args[1:]:
+                if "=" not in arg:
+                    raise ValueError("invalid argument {}".format(arg))
+                key, value = arg.split("=", 1)
+                if key == "order_by":
+                    value = value.strip('"').split(",")
+                elif value[:1] == '"':
+                    value = value.strip('"').replace("_", " ")
+                else:
+                    try:
+                        value = literal_eval(value)
+                    except (SyntaxError, ValueError):
+                        pass
+                kwargs[key] = value
+            self.print_list(storage.query(classes[args[0]], **kwargs))
 
         except NameError:
             print("** class doesn't exist **")
+        except (TypeError, ValueError) as error:
+            print("** {} **".format(error))
 
     def do_update(self, line):
         """Updates an instanceby adding or updating attribute
@@ -170,24 +174,23 @@ class HBNBCommand(cmd.Cmd):
             if not line:
                 raise SyntaxError()
             my_list = split(line, " ")
-            if my_list[0] not in self.__classes:
+            if my_list[0] not in classes:
                 raise NameError()
             if len(my_list) < 2:
                 raise IndexError()
-            objects = storage.all()
-            key = my_list[0] + '.' + my_list[1]
-            if key not in objects:
+            v = storage.get(my_list[0], my_list[1])
+            if v is None:
                 raise KeyError()
             if len(my_list) < 3:
                 raise AttributeError()
             if len(my_list) < 4:
                 raise ValueError()
-            v = objects[key]
             try:
-                v.__dict__[my_list[2]] = eval(my_list[3])
-            except Exception:
-                v.__dict__[my_list[2]] = my_list[3]
-                v.save()
+                value = literal_eval(my_list[3])
+            except (SyntaxError, ValueError):
+                value = my_list[3]
+            setattr(v, my_list[2], value)
+            v.save()
         except SyntaxError:
             print("** class name missing **")
         except NameError:
@@ -204,20 +207,27 @@ class HBNBCommand(cmd.Cmd):
     def count(self, line):
         """count the number of instances of a class
         """
-        counter = 0
         try:
             my_list = split(line, " ")
-            if my_list[0] not in self.__classes:
+            if my_list[0] not in classes:
                 raise NameError()
-            objects = storage.all()
-            for key in objects:
-                name = key.split('.')
-                if name[0] == my_list[0]:
-                    counter += 1
-            print(counter)
+            print(storage.count(my_list[0]))
         except NameError:
             print("** class doesn't exist **")
 
+    def print_list(self, objs):
+        """prints the list of the string representations of objs, as
+        print() does, one object at a time
+        Args:
+            objs: iterable of objects, e.g. storage.iter_all()
+        """
+        sep = ""
+        print("[", end="")
+        for obj in objs:
+            print(sep + repr(obj.__str__()), end="")
+            sep = ", "
+        print("]")
+
     def strip_clean(self, args):
         """strips the argument and return a string of command
         Args:
@@ -258,7 +268,6 @@ class HBNBCommand(cmd.Cmd):
             elif my_list[1][:6] == "update":
                 args = self.strip_clean(my_list)
                 if isinstance(args, list):
-                    obj = storage.all()
                     key = args[0] + ' ' + args[1]
                     for k, v in args[2].items():
                         self.do_update(key + ' "{}" "{}"'.format(k, v))
@@ -2,13 +2,35 @@
 """Instantiates a storage object.
 
 -> If the environmental variable 'HBNB_TYPE_STORAGE' is set to 'db',
-   instantiates a database storage engine (DBStorage).
+   instantiates a database storage engine (DBStorage) on MySQL.
+-> If it is set to 'sqlite', instantiates DBStorage on a local SQLite
+   database file instead.
 -> Otherwise, instantiates a file storage engine (FileStorage).
+
+The 'classes' registry maps the name of every model class to the class,
+for the storage engines and the console to resolve class names.
 """
 from os import getenv
+from models.base_model import BaseModel
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+classes = {
+    "BaseModel": BaseModel,
+    "Amenity": Amenity,
+    "City": City,
+    "Place": Place,
+    "Review": Review,
+    "State": State,
+    "User": User
+}
 
 
-if getenv("HBNB_TYPE_STORAGE") == "db":
+if getenv("HBNB_TYPE_STORAGE") in ("db", "sqlite"):
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
 else:
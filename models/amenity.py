@@ -1,14 +1,16 @@
 #!/usr/bin/python3
 """Defines the Amenity class."""
 from os import getenv
+import models
 from models.base_model import Base
-from models.base_model import BaseModel
+from models.base_model import BaseModel, compact
 from sqlalchemy import Column
+from sqlalchemy import Index
 from sqlalchemy import String
 from sqlalchemy.orm import relationship
 
 
-if getenv("HBNB_TYPE_STORAGE") and getenv("HBNB_TYPE_STORAGE") == "db":
+if getenv("HBNB_TYPE_STORAGE") in ("db", "sqlite"):
     class Amenity(BaseModel, Base):  # type: ignore
         """Represents an Amenity for a MySQL database.
 
@@ -22,6 +24,7 @@ if getenv("HBNB_TYPE_STORAGE") and getenv("HBNB_TYPE_STORAGE") == "db":
                                                         relationship.
         """
         __tablename__ = "amenities"
+        __table_args__ = (Index("ix_amenities_name", "name", "id"),)
         name = Column(String(128), nullable=False)
         place_amenities = relationship("Place", secondary="place_amenity",
                                        viewonly=True)
@@ -31,3 +34,11 @@ else:
         Represents an Amenity for a MySQL database.
         """
         name = ''
+
+        @property
+        def place_amenities(self):
+            """Get a list of the Places linked to this Amenity."""
+            return models.storage.lookup("Place", "amenity_ids", self.id)
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        Amenity = compact(Amenity)
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 """Defines the BaseModel class."""
 import models
+from copy import copy
 from uuid import uuid4
 from datetime import datetime
+from os import getenv
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column
 from sqlalchemy import DateTime
@@ -27,18 +29,64 @@ class BaseModel:
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
 
+        A new id and the current datetime are only generated when kwargs
+        do not provide them.
+
         Args:
             *args (any): Unused.
             **kwargs (dict): Key/value pairs of attributes.
         """
-        self.id = str(uuid4())
-        self.created_at = self.updated_at = datetime.utcnow()
-        if kwargs:
-            for key, value in kwargs.items():
-                if key == "created_at" or key == "updated_at":
-                    value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
-                if key != "__class__" and hasattr(self, key):
-                    setattr(self, key, value)
+        if "id" not in kwargs:
+            self.id = str(uuid4())
+        if "created_at" not in kwargs or "updated_at" not in kwargs:
+            self.created_at = self.updated_at = datetime.utcnow()
+        for key, value in kwargs.items():
+            if key in ("created_at", "updated_at") and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            if key != "__class__" and hasattr(self, key):
+                setattr(self, key, value)
+
+    if getenv("HBNB_TYPE_STORAGE") not in ("db", "sqlite"):
+        def __setattr__(self, name, value):
+            """Set the attribute name, then tell FileStorage it changed.
+
+            A stored object is then written again by the next save(),
+            and its indexed references are refreshed.
+            """
+            super().__setattr__(name, value)
+            storage = getattr(models, "storage", None)
+            if storage is not None:
+                storage.changed(self, name)
+
+    @classmethod
+    def from_dict(cls, record):
+        """Return an instance of cls built from a to_dict() dictionary.
+
+        This is the fast path for trusted records, such as those read back
+        by the storage: __init__ is skipped, every attribute of record is
+        set as it is and only the two datetimes are parsed. Classes mapped
+        by SQLAlchemy are still built through __init__.
+
+        Args:
+            record (dict): A dictionary returned by to_dict(), with or
+                without native datetimes.
+        """
+        if hasattr(cls, "__table__"):
+            record = dict(record)
+            record.pop("__class__", None)
+            return cls(**record)
+        obj = cls.__new__(cls)
+        if "__slots__" in cls.__dict__:
+            for key, value in record.items():
+                if key != "__class__":
+                    setattr(obj, key, value)
+        else:
+            obj.__dict__.update(record)
+            obj.__dict__.pop("__class__", None)
+        for key in ("created_at", "updated_at"):
+            if isinstance(record[key], str):
+                setattr(obj, key, datetime.fromisoformat(record[key]))
+        return obj
 
     def save(self):
         """Update updated_at with the current datetime."""
@@ -46,25 +94,82 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self):
+    def to_dict(self, native=False):
         """Return a dictionary representation of the BaseModel instance.
 
         Includes the key/value pair __class__ representing
         the class name of the object.
+
+        Args:
+            native (bool): Keep created_at and updated_at as datetime
+                objects instead of ISO 8601 strings.
         """
-        my_dict = self.__dict__.copy()
+        my_dict = self.__attributes()
         my_dict["__class__"] = str(type(self).__name__)
-        my_dict["created_at"] = self.created_at.isoformat()
-        my_dict["updated_at"] = self.updated_at.isoformat()
+        if not native:
+            my_dict["created_at"] = self.created_at.isoformat()
+            my_dict["updated_at"] = self.updated_at.isoformat()
         my_dict.pop("_sa_instance_state", None)
         return my_dict
 
+    def __attributes(self):
+        """Return a copy of the instance attributes, set slots included."""
+        attributes = {}
+        for name in type(self).__dict__.get("__slots__", ()):
+            try:
+                attributes[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        attributes.update(self.__dict__)
+        return attributes
+
     def delete(self):
         """Delete the current instance from storage."""
         models.storage.delete(self)
 
     def __str__(self):
         """Return the print/str representation of the BaseModel instance."""
-        d = self.__dict__.copy()
+        d = self.__attributes()
         d.pop("_sa_instance_state", None)
         return "[{}] ({}) {}".format(type(self).__name__, self.id, d)
+
+
+def compact(cls):
+    """Return a compact, __slots__ based variant of the model class cls.
+
+    The variant subclasses cls under the same name, so that isinstance()
+    checks, storage keys and to_dict() are unchanged. The attributes of
+    BaseModel and the class-level defaults of cls are stored in slots
+    instead of a per-instance __dict__; an unset slot still reads as the
+    default of cls, and other attributes are kept in __dict__ as usual.
+    A mutable default, such as Place.amenity_ids, is copied into the slot
+    on first access, so that instances never share it. A class already
+    compact is returned as it is.
+
+    Args:
+        cls (type): A model class used with FileStorage.
+    """
+    if "__slots__" in cls.__dict__:
+        return cls
+    fields = ["id", "created_at", "updated_at"]
+    mutable = set()
+    for name, value in vars(cls).items():
+        if not name.startswith("_") and not callable(value) and \
+                not isinstance(value, property):
+            fields.append(name)
+            if isinstance(value, (list, dict, set)):
+                mutable.add(name)
+
+    def __getattr__(self, name):
+        """Return the class-level default of an unset attribute."""
+        value = getattr(cls, name)
+        if name in mutable:
+            value = copy(value)
+            object.__setattr__(self, name, value)
+        return value
+
+    return type(cls.__name__, (cls,), {"__slots__": tuple(fields),
+                                       "__getattr__": __getattr__,
+                                       "__doc__": cls.__doc__,
+                                       "__module__": cls.__module__,
+                                       "__qualname__": cls.__qualname__})
@@ -1,14 +1,14 @@
 #!/usr/bin/python3
 """Defines the City class."""
 from os import getenv
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, compact
 
 STORAGE_TYPE = getenv("HBNB_TYPE_STORAGE")
 
 
-if STORAGE_TYPE and STORAGE_TYPE == "db":
+if STORAGE_TYPE in ("db", "sqlite"):
     class City(BaseModel, Base):
         """Represents a city for a MySQL database.
 
@@ -20,13 +20,14 @@ if STORAGE_TYPE and STORAGE_TYPE == "db":
             state_id (sqlalchemy String): The state id of the City.
         """
         __tablename__ = "cities"
+        __table_args__ = (Index("ix_cities_name", "name", "id"),)
 
         name = Column(String(128), nullable=False)
         state_id = Column(String(60), ForeignKey("states.id"),
-                          nullable=False)
+                          nullable=False, index=True)
         places = relationship("Place", backref="cities",
                               cascade="all, delete-orphan")
-if not STORAGE_TYPE or STORAGE_TYPE != 'db':
+if STORAGE_TYPE not in ("db", "sqlite"):
     class City(BaseModel):
         """Represents a city for a MySQL database.
 
@@ -39,3 +40,6 @@ if not STORAGE_TYPE or STORAGE_TYPE != 'db':
         """
         state_id = ""
         name = ""
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        City = compact(City)
@@ -1,74 +1,1204 @@
 #!/usr/bin/python3
 """Defines the FileStorage class."""
+import atexit
+import fcntl
+import heapq
 import json
-from models.base_model import BaseModel
-from models.amenity import Amenity
-from models.city import City
-from models.place import Place
-from models.review import Review
-from models.state import State
-from models.user import User
+import os
+import threading
+import time
+import types
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import chain
+from os import getenv
+import models
+from models.engine.query import OPERATORS, parse_filters, parse_load, \
+    parse_order, parse_page
+from models.engine.serializers import Snapshot, get_serializer
 
 
 class FileStorage:
     """Represent an abstracted storage engine.
 
+    If the environmental variable 'HBNB_FILE_JOURNAL' is set to '1',
+    save() appends the objects changed through new()/delete() to a
+    journal file instead of rewriting the whole JSON file. The journal
+    is folded back into the JSON file once it holds more records than
+    'HBNB_FILE_JOURNAL_MAX' (default 1000) or the number of objects.
+
+    If 'HBNB_FILE_LAZY' is set to '1', reload() keeps the stored records
+    as they are read and an object is only created when it is first
+    reached through all() or a relationship.
+
+    'HBNB_FILE_FORMAT' selects the serializer of the snapshot file (see
+    models.engine.serializers): 'json' (default) uses __file_path, other
+    formats a file named after it with their own extension.
+
+    The snapshot file is written to a temporary file renamed over it, so
+    a crash during save() leaves the previous snapshot intact.
+    'HBNB_FILE_FSYNC' sets when the written files are flushed to disk:
+    'never' (default, left to the operating system), 'always' (on every
+    save) or a number of milliseconds (on the first save once that long
+    has passed since the last flush).
+
+    If 'HBNB_FILE_LAYOUT' is set to 'sharded', the snapshot is split into
+    one file per class in a directory named after __file_path (e.g.
+    file_storage/State.json). save() only rewrites the files of the classes
+    changed since the last snapshot, and reload() only reads a file when
+    its class is first reached.
+
+    If 'HBNB_FILE_FORMAT' is 'snapshot', reload() maps file.snapshot in
+    memory instead of reading it, and a class is only decoded when it is
+    first reached; processes serving the same snapshot share its pages.
+    The map is dropped, and its remaining records kept as JSON text, on
+    the first new(), delete() or save().
+
+    Several processes can share the same files: save() holds an exclusive
+    lock on a '.lock' file next to the snapshot, and reload() a shared
+    one (flock(2) advisory locks). The lock file holds a generation
+    counter, incremented by every process taking the exclusive lock.
+    The counter, and the size, inode and mtime of the files read or
+    written last, are kept; when they changed, save() first merges the
+    objects on disk with the pending changes of this process (which win
+    for the objects they touch), and close() only reloads then, so that
+    it costs a few stat(2) calls when nothing changed.
+
     Attributes:
         __file_path (str): The name of the file to save objects to.
         __objects (dict): A dictionary of instantiated objects.
+        __by_class (dict): The objects of __objects bucketed by class name.
+        __indexed (dict): The __objects dictionary __by_class was built for.
+        __records (dict): The stored records not instantiated yet, by
+            class name then key, as JSON text or decoded dictionaries.
+        __unparsed (set): The class names with records still held as text.
+        __references (tuple): The (class name, attribute) pairs holding
+            the id of another object, indexed in __by_ref.
+        __by_ref (dict): For each of __references, the keys of objects and
+            decoded records bucketed by the value of the attribute (each
+            id for list attributes).
+        __ref_values (dict): The referenced ids last indexed for each key.
+        __changes (dict): Objects changed since the last save, by key.
+            A value of None marks a deleted object.
+        __journal_size (int): The number of records in the journal.
+        __synced_at (float): The time.monotonic() of the last flush.
+        __unsynced (set): The paths of the files written since they were
+            last flushed, with an interval as 'HBNB_FILE_FSYNC'.
+        __flush_timer (threading.Timer): The timer calling flush() at the
+            end of the interval, if any.
+        __encoded (dict): The entry last written for each unchanged object,
+            by key, with the content of its list attributes, reused by the
+            next snapshot. An object is dropped from it whenever it is
+            stored, changed or deleted, i.e. by new(), changed(), delete()
+            and reload(); an entry whose lists were changed in place is
+            encoded again.
+        __list_attrs (dict): The names of the attributes with a list as
+            class-level default, by class.
+        __encoded_format (str): The format of the entries in __encoded.
+        __dirty (set): The class names changed since the last snapshot.
+        __shards (set): The class names whose shard is not read yet.
+        __snapshot (Snapshot): The mapped snapshot file, if any.
+        __snapshot_done (set): The class names instantiated from it.
+        __stamps (dict): The (inode, size, mtime) of each file of the
+            snapshot and journal as last read or written, by path, and
+            the generation of the lock file.
+        __lock (threading.RLock): Held by the thread holding the lock of
+            the snapshot, so that the threads of a process take turns.
+        __lock_depth (threading.local): The nesting depth of the lock
+            held by the current thread, if any.
+        __generation_format (str): The format of the generation counter
+            written to the lock file.
     """
 
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __indexed = None
+    __records = {}
+    __unparsed = set()
+    __references = (("City", "state_id"), ("Review", "place_id"),
+                    ("Review", "user_id"), ("Place", "city_id"),
+                    ("Place", "user_id"), ("Place", "amenity_ids"))
+    __by_ref = {}
+    __ref_values = {}
+    __changes = {}
+    __journal_size = 0
+    __synced_at = 0.0
+    __unsynced = set()
+    __flush_timer = None
+    __encoded = {}
+    __encoded_format = None
+    __list_attrs = {}
+    __dirty = set()
+    __shards = set()
+    __snapshot = None
+    __snapshot_done = set()
+    __stamps = {}
+    __lock = threading.RLock()
+    __lock_depth = threading.local()
+    __generation_format = "{:020d}"
 
     def all(self, cls=None):
         """Return a dictionary of instantiated objects in __objects.
 
-        If a cls is specified, returns a dictionary of objects of that type.
+        If a cls (class or class name) is specified, returns a read-only
+        view of the objects of that type kept in the per-class index: it
+        is not copied, so it follows the storage (even for a class without
+        objects yet), and deleting objects
+        while iterating over it raises RuntimeError (iterate over
+        iter_all(cls) or a list(...) of it instead).
         Otherwise, returns the __objects dictionary.
+        Records not instantiated yet are instantiated first.
         """
+        self.__index()
         if cls is not None:
-            if isinstance(cls, str):
-                try:
-                    cls = globals()[cls]
-                    print(cls)
-                except Exception as e:
-                    print('cls not valid: ', e)
-            cls_dict = {}
-            for k, v in self.__objects.items():
-                if cls == type(v):
-                    cls_dict[k] = v
-            return cls_dict
+            name = cls if isinstance(cls, str) else getattr(cls, "__name__",
+                                                            None)
+            self.__load_shards(name)
+            self.__from_snapshot(name)
+            if name in FileStorage.__records:
+                self.__instantiate(name)
+            if name is None:
+                return types.MappingProxyType({})
+            return types.MappingProxyType(
+                self.__index().setdefault(name, {}))
+        self.__load_shards()
+        self.__from_snapshot()
+        for name in list(FileStorage.__records):
+            self.__instantiate(name)
         return self.__objects
 
+    def iter_all(self, cls=None, batch_size=None):
+        """Yield the objects of all(cls), in the same order.
+
+        The objects are in memory already (see DBStorage.iter_all()); the
+        storage may be changed while iterating.
+
+        Args:
+            cls (type|str): The class of the objects, all classes if None.
+            batch_size (int): Ignored.
+        """
+        yield from list(self.all(cls).values())
+
     def new(self, obj):
         """Set in __objects obj with key <obj_class_name>.id."""
-        self.__objects["{}.{}".format(type(obj).__name__, obj.id)] = obj
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__detach()
+        self.__put(key, obj)
+        self.__changes[key] = obj
+        FileStorage.__dirty.add(type(obj).__name__)
+
+    def changed(self, obj, attr):
+        """Mark obj changed after its attribute attr was set.
+
+        Called by BaseModel.__setattr__(): if obj is stored, the next
+        save() writes it again and, if attr is indexed, its references
+        are indexed again. Objects not stored are ignored.
+
+        Args:
+            obj (BaseModel): The object changed.
+            attr (str): The name of the attribute set.
+        """
+        name = type(obj).__name__
+        key = "{}.{}".format(name, getattr(obj, "id", None))
+        if self.__objects.get(key) is not obj:
+            return
+        FileStorage.__encoded.pop(key, None)
+        self.__changes[key] = obj
+        FileStorage.__dirty.add(name)
+        if (name, attr) in self.__references and \
+                FileStorage.__indexed is self.__objects:
+            self.__remove_refs(key)
+            self.__add_refs(key, name, self.__getter(obj))
+
+    def bulk_new(self, objs, batch_size=None):
+        """Set in __objects every object of objs, then save() them once.
+
+        Args:
+            objs (iterable): The new objects.
+            batch_size (int): Ignored, the objects are written by a single
+                save() (see DBStorage.bulk_new()).
+        """
+        for obj in objs:
+            self.new(obj)
+        self.save()
+
+    def bulk_update(self, objs, batch_size=None):
+        """Update updated_at of every object of objs, then save() them once.
+
+        Args:
+            objs (iterable): The changed objects.
+            batch_size (int): Ignored, see bulk_new().
+        """
+        now = datetime.utcnow()
+        for obj in objs:
+            obj.updated_at = now
+            self.new(obj)
+        self.save()
+
+    def lookup(self, cls, attr, value):
+        """Return the list of cls objects whose attr refers to value.
+
+        attr is the name of an attribute holding an id, such as
+        City.state_id, or a list of ids, such as Place.amenity_ids.
+        Attributes listed in __references are answered from an index,
+        others by a scan of all(cls). The index follows the attributes
+        set (see changed()); a list of ids, which can also be changed in
+        place, is indexed again for the objects instantiated where it
+        changed, and the objects found are checked again.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__index()
+        self.__load_shards(name)
+        self.__from_snapshot(name)
+        if (name, attr) in self.__references:
+            if name in FileStorage.__unparsed:
+                self.__parse(name)
+            if attr in self.__list_names(models.classes.get(name, object)):
+                self.__refresh_refs(name, attr)
+            keys = list(FileStorage.__by_ref[(name, attr)].get(value, ()))
+            objs = (self.__objects.get(key) or self.__instantiate(name, key)
+                    for key in keys)
+        else:
+            objs = self.all(name).values()
+        return [obj for obj in objs if self.__refers(obj, attr, value)]
+
+    @staticmethod
+    def __refers(obj, attr, value):
+        """Return whether the attribute attr of obj is or holds value."""
+        ref = getattr(obj, attr, None)
+        return ref == value or isinstance(ref, list) and value in ref
+
+    def get(self, cls, id):
+        """Return the object of class cls (or class name) and id, or None.
+
+        Only the record of that object is decoded if its class was not
+        instantiated yet (in lazy mode, or from the mapped snapshot).
+        """
+        name = cls if isinstance(cls, str) else getattr(cls, "__name__",
+                                                        None)
+        key = "{}.{}".format(name, id)
+        self.__index()
+        self.__load_shards(name)
+        obj = self.__objects.get(key)
+        if obj is not None:
+            return obj
+        if key in FileStorage.__records.get(name, ()):
+            return self.__instantiate(name, key)
+        snapshot = FileStorage.__snapshot
+        if snapshot is not None and name not in FileStorage.__snapshot_done:
+            record = snapshot.get(key)
+            if record is not None:
+                self.__load(key, record)
+                return self.__objects[key]
+        return None
+
+    def count(self, cls=None):
+        """Return the number of objects of class cls (or class name) stored,
+        or of all objects if cls is None, without instantiating them."""
+        if cls is None:
+            return sum(self.count(name) for name in models.classes)
+        name = cls if isinstance(cls, str) else getattr(cls, "__name__",
+                                                        None)
+        self.__index()
+        self.__load_shards(name)
+        snapshot = FileStorage.__snapshot
+        if snapshot is not None and name not in FileStorage.__snapshot_done:
+            return snapshot.count(name + ".")
+        return len(self.__index().get(name, ())) + \
+            len(FileStorage.__records.get(name, ()))
+
+    def query(self, cls, order_by=None, limit=None, offset=0, load=None,
+              **filters):
+        """Return the objects of class cls (or class name) matching filters.
+
+        An equality filter on the id or on an attribute of __references
+        (e.g. Place.city_id) is answered from the index, the other filters
+        are checked on its objects; without one, on all(cls). A value that
+        cannot be compared with the filter's (e.g. None) does not match.
+        With a limit, and an ordering in one direction, only the first
+        offset + limit objects are kept sorted (heapq) instead of all,
+        unless they are more than a quarter of the matching objects.
+        The relationships named by load are checked but not loaded: they
+        are properties answered from the index on each access anyway.
+
+        Args:
+            cls (type|str): The class of the objects.
+            order_by (str|list): The attribute(s) to sort by, see
+                models.engine.query; the storage order by default.
+            limit (int): The maximum number of objects returned.
+            offset (int): The number of matching objects skipped first.
+            load (str|list): The relationships to load with the objects,
+                see models.engine.query.
+            **filters: The filters, see models.engine.query.
+
+        Return:
+            The list of matching objects.
+
+        Raises:
+            ValueError: If a filter, ordering, limit or offset is invalid.
+        """
+        limit, offset = parse_page(limit, offset)
+        if isinstance(cls, str):
+            cls = models.classes.get(cls)
+        if cls is None:
+            return []
+        name = cls.__name__
+        filters = parse_filters(cls, filters)
+        order = parse_order(cls, order_by)
+        parse_load(cls, load)
+        objs = None
+        for attr, op, value in filters:
+            if op == "eq" and attr == "id":
+                obj = self.get(name, value)
+                objs = [obj] if obj is not None else []
+                break
+            if op == "eq" and (name, attr) in self.__references and \
+                    not isinstance(getattr(cls, attr, None), list):
+                objs = self.lookup(name, attr, value)
+                break
+        if objs is None:
+            objs = self.all(name).values()
+        if filters:
+            objs = [obj for obj in objs if self.__matches(obj, filters)]
+        end = None if limit is None else offset + limit
+        if order and end is not None and end * 4 < len(objs) and \
+                len({descending for _, descending in order}) == 1:
+            keys = [self.__sort_key(attr) for attr, _ in order]
+            pick = heapq.nlargest if order[0][1] else heapq.nsmallest
+            objs = pick(end, objs, key=lambda obj: [key(obj) for key in keys])
+        else:
+            objs = list(objs)
+            for attr, descending in reversed(order):
+                objs.sort(key=self.__sort_key(attr), reverse=descending)
+        return objs[offset:end]
+
+    @staticmethod
+    def __matches(obj, filters):
+        """Return whether obj passes the parsed filters."""
+        for attr, op, value in filters:
+            try:
+                if not OPERATORS[op](getattr(obj, attr, None), value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    @staticmethod
+    def __sort_key(attr):
+        """Return the sort key of attribute attr, None values first."""
+        def key(obj):
+            value = getattr(obj, attr, None)
+            return (value is not None, value)
+        return key
+
+    def __index(self):
+        """Return __by_class, rebuilt if __objects changed behind our back.
+
+        The index is rebuilt when __objects was replaced or when its size
+        no longer matches the buckets, e.g. after a direct del on it.
+        The reference index __by_ref is rebuilt along with it. If __objects
+        was replaced, the records not instantiated yet, the shards not
+        read yet and the mapped snapshot are dropped, every class is marked
+        changed and the files on disk are no longer watched for changes
+        (unless this is the first index).
+        """
+        by_class = FileStorage.__by_class
+        if (FileStorage.__indexed is not self.__objects or
+                sum(map(len, by_class.values())) != len(self.__objects)):
+            if FileStorage.__indexed is not self.__objects:
+                FileStorage.__records = {}
+                FileStorage.__unparsed = set()
+                FileStorage.__shards = set()
+                self.__unmap()
+                if FileStorage.__indexed is not None:
+                    FileStorage.__dirty = set(models.classes)
+                    FileStorage.__stamps = {}
+            by_class = FileStorage.__by_class = {}
+            FileStorage.__by_ref = {ref: {} for ref in self.__references}
+            FileStorage.__ref_values = {}
+            FileStorage.__encoded = {}
+            for key, obj in self.__objects.items():
+                name = type(obj).__name__
+                by_class.setdefault(name, {})[key] = obj
+                self.__add_refs(key, name, self.__getter(obj))
+            for name, records in FileStorage.__records.items():
+                for key, record in records.items():
+                    if not isinstance(record, str):
+                        self.__add_refs(key, name, record.get)
+            FileStorage.__indexed = self.__objects
+        return by_class
+
+    @staticmethod
+    def __getter(obj):
+        """Return a function reading the attributes of obj, or None."""
+        return lambda attr: getattr(obj, attr, None)
+
+    def __add_refs(self, key, name, get):
+        """Index the references of the object or record stored under key.
+
+        Args:
+            key (str): The key of the object or record.
+            name (str): The class name of the object or record.
+            get (callable): Returns the value of an attribute, or None.
+        """
+        values = {}
+        for ref in self.__references:
+            if ref[0] != name:
+                continue
+            ids = self.__ref_ids(get(ref[1]))
+            for ref_id in ids:
+                FileStorage.__by_ref[ref].setdefault(ref_id, {})[key] = None
+            values[ref] = ids
+        if values:
+            FileStorage.__ref_values[key] = values
+
+    @staticmethod
+    def __ref_ids(value):
+        """Return the tuple of the ids held by a reference attribute."""
+        if isinstance(value, list):
+            return tuple(value)
+        return (value,) if value else ()
+
+    def __refresh_refs(self, name, attr):
+        """Index again the objects of class name whose list of ids attr
+        was changed in place, without changed() being called."""
+        ref = (name, attr)
+        for key, obj in self.__index().get(name, {}).items():
+            ids = self.__ref_ids(getattr(obj, attr, None))
+            if FileStorage.__ref_values.get(key, {}).get(ref, ()) != ids:
+                self.__remove_refs(key)
+                self.__add_refs(key, name, self.__getter(obj))
+
+    def __remove_refs(self, key):
+        """Drop the references indexed for key."""
+        for ref, ids in FileStorage.__ref_values.pop(key, {}).items():
+            for ref_id in ids:
+                refs = FileStorage.__by_ref[ref].get(ref_id)
+                if refs is not None:
+                    refs.pop(key, None)
+                    if not refs:
+                        del FileStorage.__by_ref[ref][ref_id]
+
+    def __put(self, key, obj):
+        """Store obj under key in __objects and in the indexes."""
+        name = type(obj).__name__
+        self.__index()
+        self.__load_shards(name)
+        by_class = self.__index()
+        self.__drop_record(name, key)
+        FileStorage.__encoded.pop(key, None)
+        self.__objects[key] = obj
+        by_class.setdefault(name, {})[key] = obj
+        self.__remove_refs(key)
+        self.__add_refs(key, name, self.__getter(obj))
+
+    def __pop(self, key):
+        """Remove key from __objects, __records and the indexes.
+
+        Return:
+            The object or record removed, or None if there was none.
+        """
+        self.__index()
+        self.__load_shards(key.split(".")[0])
+        by_class = self.__index()
+        FileStorage.__encoded.pop(key, None)
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            by_class[type(obj).__name__].pop(key, None)
+        else:
+            obj = self.__drop_record(key.split(".")[0], key)
+        if obj is not None:
+            self.__remove_refs(key)
+        return obj
+
+    def __stash(self, key, record):
+        """Keep the record of key to instantiate it on first access.
+
+        Args:
+            key (str): The key of the record.
+            record (str|dict): The record as JSON text or a dictionary.
+        """
+        self.__pop(key)
+        name = key.split(".")[0]
+        FileStorage.__records.setdefault(name, {})[key] = record
+        if isinstance(record, str):
+            FileStorage.__unparsed.add(name)
+        else:
+            self.__add_refs(key, name, record.get)
+
+    def __drop_record(self, name, key):
+        """Remove and return the record of key not instantiated yet."""
+        records = FileStorage.__records.get(name)
+        if not records:
+            return None
+        record = records.pop(key, None)
+        if not records:
+            del FileStorage.__records[name]
+            FileStorage.__unparsed.discard(name)
+        return record
+
+    def __parse(self, name):
+        """Decode the records of class name still held as JSON text."""
+        records = FileStorage.__records.get(name, {})
+        for key, record in records.items():
+            if isinstance(record, str):
+                records[key] = record = json.loads(record)
+                self.__add_refs(key, name, record.get)
+        FileStorage.__unparsed.discard(name)
+
+    def __instantiate(self, name, key=None):
+        """Instantiate the record of key, or every record of class name.
+
+        Return:
+            The object instantiated for key, if a key is given.
+        """
+        if key is None:
+            for key in list(FileStorage.__records.get(name, ())):
+                self.__instantiate(name, key)
+            return None
+        record = self.__drop_record(name, key)
+        if isinstance(record, str):
+            record = json.loads(record)
+        self.__load(key, record)
+        return self.__objects[key]
+
+    def __count(self):
+        """Return the number of objects and records held."""
+        return len(self.__objects) + sum(map(len,
+                                             FileStorage.__records.values()))
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
-        odict = {o: self.__objects[o].to_dict() for o in self.__objects.keys()}
-        with open(self.__file_path, "w", encoding="utf-8") as f:
-            json.dump(odict, f)
+        """Serialize __objects to the snapshot file.
+
+        In journaled mode, only the pending changes are appended to the
+        journal file, unless the journal is due for compaction.
+        If another process changed the files since they were last read,
+        they are merged in first (before a compaction, in journaled mode).
+        """
+        with self.__locked(exclusive=True):
+            self.__detach()
+            sync = self.__sync_due()
+            changed = self.__changed()
+            compact = True
+            if getenv("HBNB_FILE_JOURNAL") == "1":
+                self.__append_journal(sync)
+                limit = int(getenv("HBNB_FILE_JOURNAL_MAX", "1000"))
+                compact = FileStorage.__journal_size > max(limit,
+                                                           self.__count())
+            if compact:
+                if changed:
+                    self.__merge()
+                self.__write_snapshot(sync)
+            if compact or not changed:
+                FileStorage.__stamps = self.__stamp_all()
+            self.__defer_flush()
+
+    @contextmanager
+    def __locked(self, exclusive=False):
+        """Hold the lock of the snapshot, unless this thread already does.
+
+        The other threads of the process wait for it on __lock, the
+        other processes on the lock file.
+
+        Args:
+            exclusive (bool): Take an exclusive (write) lock rather than
+                a shared (read) one.
+        """
+        depth = getattr(FileStorage.__lock_depth, "value", 0)
+        FileStorage.__lock_depth.value = depth + 1
+        try:
+            if depth:
+                yield
+                return
+            with FileStorage.__lock:
+                path = self.__lock_path
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else
+                                fcntl.LOCK_SH)
+                    if exclusive:
+                        generation = self.__read_generation(fd)
+                        counter = self.__generation_format.format(
+                            generation + 1)
+                        os.pwrite(fd, counter.encode(), 0)
+                        if FileStorage.__stamps.get(path) == generation:
+                            FileStorage.__stamps[path] = generation + 1
+                    yield
+                finally:
+                    os.close(fd)
+        finally:
+            FileStorage.__lock_depth.value -= 1
+
+    @property
+    def __lock_path(self):
+        """The path of the lock file kept next to the snapshot file."""
+        return self.__snapshot_path(get_serializer()) + ".lock"
+
+    @staticmethod
+    def __read_generation(fd):
+        """Return the generation counter held by the lock file fd."""
+        data = os.pread(fd, len(FileStorage.__generation_format.format(0)), 0)
+        return int(data) if data.strip() else 0
+
+    @staticmethod
+    def __stamp(path):
+        """Return the (inode, size, mtime) of the file path, or None."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def __stamp_all(self):
+        """Return the stamps of the snapshot (or shards) and journal, and
+        the generation of the lock file."""
+        serializer = get_serializer()
+        if self.__sharded():
+            paths = [self.__shard_path(serializer, name)
+                     for name in models.classes]
+        else:
+            paths = [self.__snapshot_path(serializer)]
+        paths.append(self.__journal_path)
+        stamps = {path: self.__stamp(path) for path in paths}
+        try:
+            fd = os.open(self.__lock_path, os.O_RDONLY)
+        except FileNotFoundError:
+            stamps[self.__lock_path] = None
+        else:
+            try:
+                stamps[self.__lock_path] = self.__read_generation(fd)
+            finally:
+                os.close(fd)
+        return stamps
+
+    def __changed(self):
+        """Return whether a file changed since last read or written.
+
+        Files not read or written yet with the current format and layout
+        are not taken into account.
+        """
+        stamps = FileStorage.__stamps
+        return any(path in stamps and stamps[path] != stamp
+                   for path, stamp in self.__stamp_all().items())
+
+    def __merge(self):
+        """Bring the storage up to date with the files changed on disk.
+
+        The changed snapshot (or shards already read) and the journal are
+        read again, the objects they no longer hold are removed, and the
+        changes pending in this process are applied back on top.
+        """
+        lazy = getenv("HBNB_FILE_LAZY") == "1"
+        serializer = get_serializer()
+        stamps = FileStorage.__stamps
+        changes = dict(self.__changes)
+        self.__detach()
+        on_disk, names = set(), []
+        if self.__sharded():
+            for name in models.classes:
+                path = self.__shard_path(serializer, name)
+                if name not in FileStorage.__shards and \
+                        self.__stamp(path) != stamps.get(path):
+                    self.__read(path, serializer, lazy, on_disk)
+                    names.append(name)
+        else:
+            self.__read(self.__snapshot_path(serializer), serializer, lazy,
+                        on_disk)
+            names = list(self.__index()) + list(FileStorage.__records)
+        self.__replay_journal(lazy, on_disk)
+        by_class = self.__index()
+        for name in set(names):
+            keys = list(by_class.get(name, ()))
+            keys += list(FileStorage.__records.get(name, ()))
+            for key in keys:
+                if key not in on_disk and key not in changes:
+                    self.__pop(key)
+        for key, obj in changes.items():
+            if obj is None:
+                self.__pop(key)
+            else:
+                self.__put(key, obj)
+        self.__changes.update(changes)
+
+    @staticmethod
+    def __interval():
+        """Return the interval of 'HBNB_FILE_FSYNC' in seconds, 0 for
+        'always' and None for 'never'.
+
+        Raises:
+            ValueError: If 'HBNB_FILE_FSYNC' is not a valid policy.
+        """
+        policy = getenv("HBNB_FILE_FSYNC") or "never"
+        if policy in ("always", "never"):
+            return 0 if policy == "always" else None
+        try:
+            return int(policy) / 1000
+        except ValueError:
+            raise ValueError("Invalid HBNB_FILE_FSYNC: {}".format(policy))
+
+    @staticmethod
+    def __sync_due():
+        """Return whether this save must be flushed to disk."""
+        interval = FileStorage.__interval()
+        if interval is None:
+            return False
+        return time.monotonic() - FileStorage.__synced_at >= interval
+
+    def __defer_flush(self):
+        """Have the files written but not flushed by a save flushed by
+        flush() at the end of the interval, unless it is already due."""
+        if not FileStorage.__unsynced:
+            return
+        interval = self.__interval()
+        if interval is None:
+            FileStorage.__unsynced = set()
+            return
+        timer = FileStorage.__flush_timer
+        if timer is not None and timer.is_alive():
+            return
+        if timer is None:
+            atexit.register(self.flush)
+        delay = FileStorage.__synced_at + interval - time.monotonic()
+        timer = FileStorage.__flush_timer = threading.Timer(max(delay, 0),
+                                                            self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        """Flush to disk the files saved but not flushed yet.
+
+        With an interval as 'HBNB_FILE_FSYNC', the saves made before it
+        is over are not flushed: a timer calls flush() at its end, and so
+        does the exit of the process, so that no save stays unflushed for
+        longer than the interval.
+        """
+        with FileStorage.__lock:
+            timer = FileStorage.__flush_timer
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            paths = FileStorage.__unsynced
+            FileStorage.__unsynced = set()
+            for path in sorted(paths):
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self.__fsync_dir(path)
+            if paths:
+                FileStorage.__synced_at = time.monotonic()
+
+    @staticmethod
+    def __fsync(f):
+        """Flush the file f to disk and record the time of the flush."""
+        f.flush()
+        os.fsync(f.fileno())
+        FileStorage.__synced_at = time.monotonic()
+        FileStorage.__unsynced.discard(f.name)
+
+    def __write_snapshot(self, sync=False):
+        """Write all of __objects to the snapshot file and drop the journal.
+
+        Objects are serialized one at a time, one entry each. Records not
+        instantiated yet are written back as they were read. In sharded
+        layout, only the shards of the classes changed are rewritten.
+        """
+        if self.__sharded():
+            self.__write_shards(get_serializer(), FileStorage.__dirty,
+                                True, sync)
+        else:
+            self.export(sync=sync)
+        FileStorage.__dirty = set()
+        self.__changes.clear()
+        if FileStorage.__journal_size or os.path.exists(self.__journal_path):
+            try:
+                os.remove(self.__journal_path)
+            except FileNotFoundError:
+                pass
+            FileStorage.__journal_size = 0
+
+    def export(self, fmt=None, sync=True, layout=None):
+        """Write every stored object to the snapshot of format fmt.
+
+        The objects are written to a temporary file which then replaces
+        the snapshot file, so readers only ever see a complete snapshot.
+
+        Args:
+            fmt (str): The name of a serializer, by default the one set
+                by 'HBNB_FILE_FORMAT'.
+            sync (bool): Flush the file and its directory entry to disk
+                before returning.
+            layout (str): 'single' or 'sharded', by default the one set
+                by 'HBNB_FILE_LAYOUT'.
+
+        Return:
+            The path of the file, or directory of shards, written.
+        """
+        serializer = get_serializer(fmt)
+        sharded = self.__sharded(layout)
+        with self.__locked(exclusive=True):
+            self.__load_shards()
+            if sharded:
+                return self.__write_shards(serializer, models.classes,
+                                           fmt is None, sync)
+            path = self.__snapshot_path(serializer, False)
+            self.__index()
+            records = (serializer.encode(key, record)
+                       for records in FileStorage.__records.values()
+                       for key, record in records.items())
+            entries = chain(self.__encode(serializer, self.__objects,
+                                          fmt is None), records)
+            self.__write_file(path, serializer, entries, sync)
+        if sync:
+            self.__fsync_dir(path)
+        return path
+
+    def __write_shards(self, serializer, names, cached, sync):
+        """Rewrite the shards of the classes names.
+
+        The shard of a class without objects is removed.
+
+        Return:
+            The path of the directory of shards.
+        """
+        directory = self.__snapshot_path(serializer, True)
+        os.makedirs(directory, exist_ok=True)
+        by_class = self.__index()
+        for name in sorted(names):
+            path = self.__shard_path(serializer, name)
+            records = FileStorage.__records.get(name, {})
+            if not by_class.get(name) and not records:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            records = (serializer.encode(key, record)
+                       for key, record in records.items())
+            entries = chain(self.__encode(serializer, by_class.get(name, {}),
+                                          cached), records)
+            self.__write_file(path, serializer, entries, sync)
+        if sync:
+            self.__fsync_dir(os.path.join(directory, ""))
+        return directory
+
+    def __write_file(self, path, serializer, entries, sync):
+        """Write the entries to a temporary file renamed to path."""
+        tmp_path = path + ".tmp"
+        try:
+            if serializer.binary:
+                f = open(tmp_path, "wb")
+            else:
+                f = open(tmp_path, "w", encoding="utf-8")
+            with f:
+                serializer.write(f, entries)
+                if sync:
+                    self.__fsync(f)
+            os.replace(tmp_path, path)
+            if sync:
+                FileStorage.__unsynced.discard(path)
+            else:
+                FileStorage.__unsynced.add(path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @staticmethod
+    def __fsync_dir(path):
+        """Flush to disk the directory entries of the directory of path."""
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __encode(self, serializer, objects, cached=False):
+        """Yield the entries of the objects of the dictionary objects.
+
+        Args:
+            serializer: The serializer encoding the entries.
+            objects (dict): The objects to encode, by key.
+            cached (bool): Reuse the entries of __encoded for the objects
+                not stored or deleted since they were encoded, and keep
+                the new ones there.
+        """
+        if not cached:
+            for key, obj in objects.items():
+                yield serializer.encode(key, serializer.record(obj))
+            return
+        if FileStorage.__encoded_format != serializer.name:
+            FileStorage.__encoded = {}
+            FileStorage.__encoded_format = serializer.name
+        encoded = FileStorage.__encoded
+        for key, obj in objects.items():
+            lists = self.__lists(obj)
+            cached = encoded.get(key)
+            if cached is None or cached[1] != lists:
+                cached = encoded[key] = (serializer.encode(
+                    key, serializer.record(obj)), lists)
+            yield cached[0]
+
+    @staticmethod
+    def __lists(obj):
+        """Return a copy of the list attributes of obj, e.g. amenity_ids.
+
+        Lists can be changed in place, without changed() being called.
+        """
+        values = (getattr(obj, name)
+                  for name in FileStorage.__list_names(type(obj)))
+        return tuple(tuple(value) if isinstance(value, list) else value
+                     for value in values)
+
+    @staticmethod
+    def __list_names(cls):
+        """Return the names of the attributes of cls with a list default."""
+        names = FileStorage.__list_attrs.get(cls)
+        if names is None:
+            names = FileStorage.__list_attrs[cls] = tuple({
+                name: None for klass in cls.__mro__
+                for name, value in vars(klass).items()
+                if isinstance(value, list)})
+        return names
+
+    @staticmethod
+    def __sharded(layout=None):
+        """Return whether layout (default 'HBNB_FILE_LAYOUT') is sharded.
+
+        Raises:
+            ValueError: If layout is neither 'single' nor 'sharded'.
+        """
+        layout = layout or getenv("HBNB_FILE_LAYOUT") or "single"
+        if layout not in ("single", "sharded"):
+            raise ValueError("Unknown storage layout: {}".format(layout))
+        return layout == "sharded"
+
+    def __snapshot_path(self, serializer, sharded=None):
+        """Return the path of the snapshot written by serializer.
+
+        That is the snapshot file, or the directory of shards if sharded
+        (by default, if 'HBNB_FILE_LAYOUT' is 'sharded').
+        """
+        if sharded is None:
+            sharded = self.__sharded()
+        if sharded:
+            return os.path.splitext(self.__file_path)[0] + "_storage"
+        if serializer.name == "json":
+            return self.__file_path
+        return os.path.splitext(self.__file_path)[0] + serializer.extension
+
+    def __shard_path(self, serializer, name):
+        """Return the path of the shard of class name."""
+        return os.path.join(self.__snapshot_path(serializer, True),
+                            name + serializer.extension)
+
+    def __append_journal(self, sync=False):
+        """Append one record per pending change to the journal file.
+
+        Args:
+            sync (bool): Flush the journal to disk after appending.
+        """
+        if not self.__changes:
+            return
+        lines = []
+        for key, obj in self.__changes.items():
+            if obj is None:
+                lines.append(json.dumps({"key": key}))
+            else:
+                lines.append(json.dumps({"key": key, "obj": obj.to_dict()}))
+        with open(self.__journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            if sync:
+                self.__fsync(f)
+            else:
+                FileStorage.__unsynced.add(self.__journal_path)
+        FileStorage.__journal_size += len(lines)
+        self.__changes.clear()
+
+    @property
+    def __journal_path(self):
+        """The path of the journal file kept next to the snapshot file."""
+        return self.__snapshot_path(get_serializer()) + ".journal"
 
     def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
+        """Deserialize the snapshot file to __objects, if it exists.
+
+        The file is parsed entry by entry and each object is created as
+        soon as its entry is read, or kept as a record in lazy mode.
+        In sharded layout, the shards are only listed here and each is
+        read when its class is first reached.
+        Any journal left next to the snapshot is replayed on top of it.
+        """
+        with self.__locked():
+            self.__reload()
+            FileStorage.__stamps = self.__stamp_all()
+
+    def __reload(self):
+        """Read the snapshot and journal, see reload()."""
+        lazy = getenv("HBNB_FILE_LAZY") == "1"
+        serializer = get_serializer()
+        if self.__sharded():
+            self.__index()
+            FileStorage.__shards = {
+                name for name in models.classes
+                if os.path.exists(self.__shard_path(serializer, name))}
+        elif serializer.name == "snapshot":
+            self.__index()
+            self.__map(self.__snapshot_path(serializer))
+        else:
+            self.__read(self.__snapshot_path(serializer), serializer, lazy)
+        self.__replay_journal(lazy)
+
+    def __read(self, path, serializer, lazy=False, keys=None):
+        """Load the entries of the file path, if it exists.
+
+        Args:
+            keys (set): If given, the keys read are added to it.
+        """
+        try:
+            if serializer.binary:
+                f = open(path, "rb")
+            else:
+                f = open(path, "r", encoding="utf-8")
+            with f:
+                for key, o in serializer.read(f, lazy):
+                    if keys is not None:
+                        keys.add(key)
+                    if lazy:
+                        self.__stash(key, o)
+                    else:
+                        self.__load(key, o)
+        except FileNotFoundError:
+            pass
+
+    def __map(self, path):
+        """Map the snapshot file path in memory, if it exists."""
+        self.__unmap()
         try:
-            with open(self.__file_path, "r", encoding="utf-8") as f:
-                for o in json.load(f).values():
-                    name = o["__class__"]
-                    del o["__class__"]
-                    self.new(eval(name)(**o))
+            with open(path, "rb") as f:
+                FileStorage.__snapshot = Snapshot(f)
         except FileNotFoundError:
             pass
 
+    @staticmethod
+    def __unmap():
+        """Drop the mapped snapshot, if any."""
+        if FileStorage.__snapshot is not None:
+            FileStorage.__snapshot.close()
+        FileStorage.__snapshot = None
+        FileStorage.__snapshot_done = set()
+
+    def __from_snapshot(self, name=None):
+        """Instantiate the class name, or every class, from the snapshot."""
+        snapshot = FileStorage.__snapshot
+        if snapshot is None:
+            return
+        for name in [name] if name else list(models.classes):
+            if name in FileStorage.__snapshot_done:
+                continue
+            FileStorage.__snapshot_done.add(name)
+            for key in snapshot.keys(name + "."):
+                if key not in self.__objects:
+                    self.__load(key, snapshot.get(key))
+
+    def __detach(self):
+        """Keep the records of the snapshot not instantiated yet as JSON
+        text and drop the snapshot, before the storage is changed."""
+        self.__index()
+        snapshot = FileStorage.__snapshot
+        if snapshot is None:
+            return
+        done = FileStorage.__snapshot_done
+        FileStorage.__snapshot = None
+        for key in snapshot.keys():
+            if key.split(".")[0] not in done and key not in self.__objects:
+                self.__stash(key, snapshot.text(key))
+        snapshot.close()
+        FileStorage.__snapshot_done = set()
+
+    def __load_shards(self, name=None):
+        """Read the shard of class name, or every shard, if not read yet."""
+        if not FileStorage.__shards:
+            return
+        if name is None:
+            names = list(FileStorage.__shards)
+        elif name in FileStorage.__shards:
+            names = [name]
+        else:
+            return
+        lazy = getenv("HBNB_FILE_LAZY") == "1"
+        serializer = get_serializer()
+        for name in names:
+            FileStorage.__shards.discard(name)
+            self.__read(self.__shard_path(serializer, name), serializer, lazy)
+
+    def __replay_journal(self, lazy=False, keys=None):
+        """Apply the records of the journal file, if it exists.
+
+        Args:
+            keys (set): If given, the keys stored by the journal are added
+                to it and the keys it deletes are removed from it.
+        """
+        count = 0
+        try:
+            with open(self.__journal_path, "r", encoding="utf-8") as f:
+                self.__detach()
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    FileStorage.__dirty.add(record["key"].split(".")[0])
+                    if keys is not None and "obj" in record:
+                        keys.add(record["key"])
+                    elif keys is not None:
+                        keys.discard(record["key"])
+                    if "obj" not in record:
+                        self.__pop(record["key"])
+                    elif lazy:
+                        self.__stash(record["key"], record["obj"])
+                    else:
+                        self.__load(record["key"], record["obj"])
+                    count += 1
+        except FileNotFoundError:
+            pass
+        FileStorage.__journal_size = count
+
+    def __load(self, key, o):
+        """Instantiate the to_dict() dictionary o and store it under key."""
+        self.__put(key, models.classes[o["__class__"]].from_dict(o))
+
     def delete(self, obj=None):
         """Delete a given object from __objects, if it exists."""
         try:
-            del self.__objects["{}.{}".format(type(obj).__name__, obj.id)]
-        except (AttributeError, KeyError):
-            pass
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+        except AttributeError:
+            return
+        self.__detach()
+        if self.__pop(key) is not None:
+            self.__changes[key] = None
+            FileStorage.__dirty.add(type(obj).__name__)
 
     def close(self):
-        """Call the reload method."""
-        self.reload()
+        """Bring the storage up to date with the files, if they changed.
+
+        Nothing is read if the files are as this process last read or
+        wrote them. Otherwise the changes on disk are merged in, keeping
+        the changes not saved yet, or the snapshot is mapped again.
+        """
+        if not self.__changed():
+            return
+        with self.__locked():
+            if FileStorage.__snapshot is not None:
+                self.__unmap()
+                for key in list(self.__objects):
+                    self.__pop(key)
+                self.__reload()
+            else:
+                self.__merge()
+            FileStorage.__stamps = self.__stamp_all()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""Converts the FileStorage snapshot to another format or layout, or
+upgrades the schema of the DBStorage database.
+
+Usage: python3 -m models.engine.migrate <format> [single|sharded]
+       python3 -m models.engine.migrate schema [upgrade]
+
+The objects are loaded from the snapshot of the current format and
+layout ('HBNB_FILE_FORMAT', 'json' by default, and 'HBNB_FILE_LAYOUT',
+'single' by default) along with its journal, and written in format
+<format> and the given layout (the current one by default), e.g.
+file.json to file.pickle, or file.json to file_storage/<Class>.json.
+Run the application with the new HBNB_FILE_FORMAT and HBNB_FILE_LAYOUT
+afterwards.
+
+With 'schema', the version of the database schema and its pending
+migrations are printed, and applied with 'upgrade'; see
+models.engine.schema.
+"""
+import sys
+from models.engine.serializers import SERIALIZERS
+
+LAYOUTS = ("single", "sharded")
+
+
+def migrate(fmt, layout=None):
+    """Write the objects of the file storage in format fmt and layout.
+
+    Return:
+        The path of the file, or directory of shards, written.
+    """
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    if not isinstance(storage, FileStorage):
+        raise ValueError("migrate only applies to the file storage")
+    return storage.export(fmt, layout=layout)
+
+
+def migrate_schema(apply=False):
+    """Upgrade the schema of the database storage if apply is True.
+
+    Return:
+        The lines describing the migrations applied, the version and the
+        pending migrations.
+    """
+    from models import storage
+    from models.engine import schema
+    from models.engine.db_storage import DBStorage
+    if not isinstance(storage, DBStorage):
+        raise ValueError("schema only applies to the database storage")
+    lines = []
+    if apply:
+        for description in schema.upgrade(storage.engine):
+            lines.append("Applied: " + description)
+    version = schema.version(storage.engine)
+    lines.append("Schema version {} of {}".format(
+        version, len(schema.MIGRATIONS)))
+    for description, _ in schema.MIGRATIONS[version:]:
+        lines.append("Pending: " + description)
+    return lines
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["schema"] and sys.argv[2:] in ([], ["upgrade"]):
+        print("\n".join(migrate_schema(sys.argv[2:] == ["upgrade"])))
+        sys.exit(0)
+    if not 2 <= len(sys.argv) <= 3 or sys.argv[1] not in SERIALIZERS or \
+            sys.argv[2:] and sys.argv[2] not in LAYOUTS:
+        print("Usage: {} <{}> [{}]".format(sys.argv[0], "|".join(SERIALIZERS),
+                                           "|".join(LAYOUTS)),
+              file=sys.stderr)
+        print("       {} schema [upgrade]".format(sys.argv[0]),
+              file=sys.stderr)
+        sys.exit(1)
+    print(migrate(*sys.argv[1:]))
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""Defines the filters and orderings shared by the storage query() APIs.
+
+Filters are keyword arguments naming an attribute, optionally followed
+by a double underscore and an operator:
+
+-> name="Napa" or name__eq="Napa": equal to the value.
+-> price_by_night__ne=0: not equal to the value.
+-> price_by_night__lt=100, __le, __gt, __ge: compared with the value.
+-> city_id__in=[...]: equal to one of the values.
+
+An ordering is an attribute name, '-' first for a descending order, or
+a list of them, the first one sorting first.
+
+A page is a limit (None for no limit) and an offset, both non-negative
+integers.
+
+A load is a relationship name, or a dotted path of them through the
+related classes (e.g. "reviews.user"), or a list of them, that the
+storage should load along with the objects rather than on first access.
+"""
+import operator
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "in": lambda value, values: value in values,
+}
+
+
+def parse_filters(cls, filters):
+    """Return the (attribute, operator name, value) of each filter.
+
+    Args:
+        cls (type): The model class the filters apply to.
+        filters (dict): The filters, as passed to query().
+
+    Raises:
+        ValueError: If an operator is unknown or cls has no such attribute.
+    """
+    parsed = []
+    for name, value in filters.items():
+        attr, _, op = name.partition("__")
+        op = op or "eq"
+        if op not in OPERATORS:
+            raise ValueError("Unknown operator: {}".format(name))
+        check_attribute(cls, attr)
+        parsed.append((attr, op, value))
+    return parsed
+
+
+def parse_order(cls, order_by):
+    """Return the (attribute, descending) pairs of the ordering order_by.
+
+    Raises:
+        ValueError: If cls has no such attribute.
+    """
+    if order_by is None:
+        return []
+    if isinstance(order_by, str):
+        order_by = [order_by]
+    order = []
+    for name in order_by:
+        attr = name.lstrip("-")
+        check_attribute(cls, attr)
+        order.append((attr, name.startswith("-")))
+    return order
+
+
+def parse_page(limit, offset):
+    """Return the (limit, offset) of a page, checked.
+
+    Raises:
+        ValueError: If limit (unless None) or offset is not a non-negative
+            integer.
+    """
+    for name, value in (("limit", limit), ("offset", offset)):
+        if value is None and name == "limit":
+            continue
+        if type(value) is not int or value < 0:
+            raise ValueError("{} must be a non-negative integer: {!r}".format(
+                name, value))
+    return limit, offset
+
+
+def parse_load(cls, load):
+    """Return the relationship names of each path of the load load.
+
+    Only the first name of a path is checked here, against cls.
+
+    Raises:
+        ValueError: If cls has no such attribute.
+    """
+    if load is None:
+        return []
+    if isinstance(load, str):
+        load = [load]
+    paths = []
+    for path in load:
+        names = path.split(".")
+        check_attribute(cls, names[0])
+        paths.append(names)
+    return paths
+
+
+def check_attribute(cls, attr):
+    """Raise a ValueError if the model class cls has no attribute attr."""
+    if attr.startswith("_") or not hasattr(cls, attr):
+        raise ValueError("{} has no attribute {}".format(cls.__name__, attr))
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""Versions the schema of the DBStorage database.
+
+Usage: python3 -m models.engine.migrate schema [upgrade]
+
+The version of the schema is kept in the schema_version table. A new
+database, whose tables are all created by DBStorage.reload(), is at the
+latest version. A database created before, e.g. by an earlier version
+of the models on the database of setup_mysql_dev.sql, lacks the indexes
+declared since: it is at version 0 until upgraded. Without argument, the
+version and the pending migrations are printed; 'upgrade' applies them,
+in order, each one committed with its new version. Run it with the
+HBNB_TYPE_STORAGE and HBNB_MYSQL_* (or HBNB_SQLITE_PATH) variables of
+the application.
+
+A migration only creates indexes declared by the models: the ones an
+existing index already covers (its first columns are the index's, as
+the index MySQL creates for each foreign key) are skipped.
+"""
+from models.base_model import Base
+from sqlalchemy import Column, Integer, Table
+from sqlalchemy import func, inspect, select
+
+schema_version = Table("schema_version", Base.metadata,
+                       Column("version", Integer, nullable=False))
+
+MIGRATIONS = (
+    ("Index the foreign keys",
+     ("ix_cities_state_id", "ix_places_city_id", "ix_places_user_id",
+      "ix_reviews_place_id", "ix_reviews_user_id",
+      "ix_place_amenity_amenity_id")),
+    ("Index the names pages are sorted by",
+     ("ix_states_name", "ix_cities_name", "ix_amenities_name",
+      "ix_places_name")),
+)
+
+
+def create(engine):
+    """Create the missing tables; a new database is at the latest version.
+    """
+    with engine.begin() as connection:
+        new = not inspect(connection).get_table_names()
+        Base.metadata.create_all(connection)
+        if new:
+            connection.execute(schema_version.insert(),
+                               {"version": len(MIGRATIONS)})
+
+
+def version(engine):
+    """Return the version of the schema of the database of engine."""
+    with engine.connect() as connection:
+        return connection.execute(
+            select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine):
+    """Apply the pending migrations to the database of engine.
+
+    Return:
+        The list of the descriptions of the migrations applied.
+    """
+    applied = []
+    for number in range(version(engine) + 1, len(MIGRATIONS) + 1):
+        description, names = MIGRATIONS[number - 1]
+        with engine.begin() as connection:
+            for index in indexes(names):
+                if not covered(connection, index):
+                    index.create(connection)
+            connection.execute(schema_version.delete())
+            connection.execute(schema_version.insert(), {"version": number})
+        applied.append(description)
+    return applied
+
+
+def indexes(names):
+    """Return the indexes of the models named names."""
+    return [index for table in Base.metadata.sorted_tables
+            for index in table.indexes if index.name in names]
+
+
+def covered(connection, index):
+    """Return whether an existing index starts with the columns of index.
+    """
+    columns = [column.name for column in index.columns]
+    for existing in inspect(connection).get_indexes(index.table.name):
+        if existing["column_names"][:len(columns)] == columns:
+            return True
+    return False
@@ -0,0 +1,506 @@
+#!/usr/bin/python3
+"""Defines the serializers FileStorage writes its snapshot file with.
+
+A serializer turns (key, record) entries into a snapshot file and back,
+where a record is the to_dict() dictionary of a stored object. Entries
+are encoded one at a time by encode() and written by write(), so that a
+snapshot can be written and read as a stream of entries.
+
+-> JSONSerializer writes the JSON object of file.json, one entry per line,
+   with datetimes as ISO 8601 strings.
+-> PickleSerializer writes pickle (protocol 5) frames to file.pickle and
+   keeps datetimes as datetime objects.
+-> SnapshotSerializer writes file.snapshot, the JSON records followed by
+   an index sorted by key, which Snapshot reads through mmap.
+
+The serializer is chosen with the environmental variable
+'HBNB_FILE_FORMAT' ('json' by default), see get_serializer().
+"""
+import json
+import mmap
+import os
+import pickle
+import re
+import struct
+from bisect import bisect_left
+from datetime import datetime
+from itertools import islice
+from os import getenv
+import models
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_object(f, chunk_size=65536):
+    """Yield the (key, value) pairs of the JSON object stored in f.
+
+    The file is read chunk_size characters at a time and each value is
+    decoded as soon as it is complete, so the whole JSON tree is never
+    held in memory at once.
+
+    Raises:
+        ValueError: If the content of f is not a JSON object.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        """Drop the consumed part of buf and read the next chunk."""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip_whitespace():
+        """Move pos to the next significant character, if any."""
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            fill()
+
+    def expect(chars):
+        """Consume one of chars or raise a JSONDecodeError."""
+        nonlocal pos
+        char = skip_whitespace()
+        if not char or char not in chars:
+            raise json.JSONDecodeError("Expecting '{}'".format(chars[0]),
+                                       buf, pos)
+        pos += 1
+        return char
+
+    def decode():
+        """Decode the value at pos, reading more chunks as needed."""
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    expect("{")
+    if skip_whitespace() == "}":
+        return
+    while True:
+        key = decode()
+        expect(":")
+        yield key, decode()
+        if expect(",}") == "}":
+            return
+
+
+def iter_json_lines(f):
+    """Yield the (key, value text) pairs of a JSON object stored in f.
+
+    Files written by FileStorage.save() hold one entry per line; for
+    those, each entry is yielded with its value as JSON text. Other
+    files, e.g. indented by json.dump(), are parsed by iter_json_object()
+    from the start as soon as a line is not a whole entry, and their
+    values are yielded as decoded dictionaries (entries yielded before
+    are yielded again).
+
+    Raises:
+        ValueError: If the content of f is not a JSON object.
+    """
+    decoder = json.JSONDecoder()
+    if f.readline().strip() == "{":
+        for line in f:
+            line = line.strip()
+            if line == "}":
+                return
+            if not line:
+                continue
+            entry = json_line_entry(decoder, line)
+            if entry is None:
+                break
+            yield entry
+        else:
+            raise ValueError("Unterminated JSON object")
+    f.seek(0)
+    yield from iter_json_object(f)
+
+
+def json_line_entry(decoder, line):
+    """Return the (key, value text) of the entry held by line, or None.
+
+    line holds an entry if it is exactly a string key, a colon and
+    a JSON object, followed by a comma unless it is the last entry.
+    """
+    try:
+        key, end = decoder.raw_decode(line)
+        value = line[end:].lstrip()
+        if not isinstance(key, str) or value[:1] != ":":
+            return None
+        value = value[1:].lstrip()
+        if value.endswith(","):
+            value = value[:-1].rstrip()
+        record, end = decoder.raw_decode(value)
+    except ValueError:
+        return None
+    if end != len(value) or not isinstance(record, dict):
+        return None
+    return key, value
+
+
+class JSONSerializer:
+    """Serializes entries as the JSON object of file.json.
+
+    Attributes:
+        name (str): The value of 'HBNB_FILE_FORMAT' selecting it.
+        extension (str): The extension of its snapshot files.
+        binary (bool): Whether its files are opened in binary mode.
+        batch_size (int): The number of entries written at once.
+    """
+
+    name = "json"
+    extension = ".json"
+    binary = False
+    batch_size = 1024
+
+    def record(self, obj):
+        """Return the record of obj to pass to encode()."""
+        return obj.to_dict()
+
+    def encode(self, key, record):
+        """Return one entry of the snapshot as a line of JSON.
+
+        Args:
+            key (str): The <class name>.<id> key of the entry.
+            record (dict|str): A to_dict() dictionary, or its JSON text.
+        """
+        if not isinstance(record, str):
+            record = json.dumps(record, default=self.isoformat)
+        return json.dumps(key) + ": " + record
+
+    @staticmethod
+    def isoformat(value):
+        """Return a datetime left in a record as an ISO 8601 string."""
+        if not isinstance(value, datetime):
+            raise TypeError("{} is not JSON serializable".format(
+                type(value).__name__))
+        return value.isoformat()
+
+    def write(self, f, entries):
+        """Write the encoded entries to the text file f.
+
+        Entries are joined batch_size at a time, which saves most of the
+        write() calls without building the whole file in memory.
+        """
+        f.write("{")
+        sep = "\n"
+        entries = iter(entries)
+        while True:
+            batch = list(islice(entries, self.batch_size))
+            if not batch:
+                break
+            f.write(sep + ",\n".join(batch))
+            sep = ",\n"
+        f.write("\n}\n")
+
+    def read(self, f, lazy=False):
+        """Yield the (key, record) entries of the text file f.
+
+        If lazy is True, records are yielded as JSON text when the file
+        holds one entry per line.
+        """
+        if lazy:
+            return iter_json_lines(f)
+        return iter_json_object(f)
+
+
+class RecordUnpickler(pickle.Unpickler):
+    """An Unpickler refusing every global but datetime, so that only plain
+    data (dicts, lists, strings, numbers, datetimes) can be loaded."""
+
+    def find_class(self, module, name):
+        """Return datetime.datetime, refuse to load any other global."""
+        if (module, name) == ("datetime", "datetime"):
+            return datetime
+        raise pickle.UnpicklingError(
+            "global '{}.{}' is forbidden".format(module, name))
+
+
+class PickleSerializer:
+    """Serializes entries as pickle (protocol 5) frames.
+
+    The file starts with a header holding the format version and the
+    model class names, followed by lists of up to batch_size (key, record)
+    entries, each pickled on its own so that a batch shares the strings
+    repeated across its records and the file can be read batch by batch.
+    Files are read with RecordUnpickler and rejected if the header does
+    not match this version or names an unknown class.
+
+    Attributes:
+        name (str): The value of 'HBNB_FILE_FORMAT' selecting it.
+        extension (str): The extension of its snapshot files.
+        binary (bool): Whether its files are opened in binary mode.
+        version (int): The version of the file layout.
+        batch_size (int): The number of entries pickled together.
+    """
+
+    name = "pickle"
+    extension = ".pickle"
+    binary = True
+    version = 1
+    batch_size = 256
+
+    def record(self, obj):
+        """Return the record of obj to pass to encode()."""
+        return obj.to_dict(native=True)
+
+    def encode(self, key, record):
+        """Return one entry of the snapshot as a (key, record) tuple.
+
+        Args:
+            key (str): The <class name>.<id> key of the entry.
+            record (dict|str): A to_dict() dictionary, or its JSON text.
+        """
+        if isinstance(record, str):
+            record = json.loads(record)
+        return key, record
+
+    def write(self, f, entries):
+        """Write the header and the encoded entries to the binary file f."""
+        header = {"format": "hbnb", "version": self.version,
+                  "classes": sorted(models.classes)}
+        pickle.dump(header, f, protocol=5)
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) == self.batch_size:
+                pickle.dump(batch, f, protocol=5)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=5)
+
+    def read(self, f, lazy=False):
+        """Yield the (key, record) entries of the binary file f.
+
+        Raises:
+            ValueError: If the file is not a snapshot of this version.
+        """
+        try:
+            header = RecordUnpickler(f).load()
+        except (EOFError, pickle.UnpicklingError) as e:
+            raise ValueError("Not an HBNB pickle snapshot: {}".format(e))
+        if not isinstance(header, dict) or \
+                header.get("format") != "hbnb" or \
+                header.get("version") != self.version:
+            raise ValueError("Unsupported pickle snapshot header")
+        unknown = set(header.get("classes", ())) - set(models.classes)
+        if unknown:
+            raise ValueError("Unknown classes in snapshot: {}".format(
+                ", ".join(sorted(unknown))))
+        while True:
+            try:
+                batch = RecordUnpickler(f).load()
+            except EOFError:
+                return
+            yield from batch
+
+
+class SnapshotSerializer:
+    """Serializes entries as a read-only snapshot indexed by key.
+
+    The file holds a header, the JSON record of every entry one after the
+    other, then an index of (key, offset, length) rows sorted by key, the
+    keys padded with NUL bytes to the width of the longest. It is meant to
+    be opened with Snapshot, which maps it in memory and only decodes
+    the records looked up, so that processes reading the same file share
+    its pages.
+
+    Attributes:
+        name (str): The value of 'HBNB_FILE_FORMAT' selecting it.
+        extension (str): The extension of its snapshot files.
+        binary (bool): Whether its files are opened in binary mode.
+        version (int): The version of the file layout.
+        header (struct.Struct): Magic, version, entries, key width and
+            offset of the index.
+        batch_size (int): The number of records written at once.
+    """
+
+    name = "snapshot"
+    extension = ".snapshot"
+    binary = True
+    version = 1
+    header = struct.Struct("<8sIQIQ")
+    magic = b"HBNBSNAP"
+    batch_size = 1024
+
+    def record(self, obj):
+        """Return the record of obj to pass to encode()."""
+        return obj.to_dict()
+
+    def encode(self, key, record):
+        """Return one entry of the snapshot as a (key, JSON bytes) tuple.
+
+        Args:
+            key (str): The <class name>.<id> key of the entry.
+            record (dict|str): A to_dict() dictionary, or its JSON text.
+        """
+        if not isinstance(record, str):
+            record = json.dumps(record, default=JSONSerializer.isoformat)
+        return key.encode("utf-8"), record.encode("utf-8")
+
+    def write(self, f, entries):
+        """Write the encoded entries and their index to the binary file f.
+
+        Only the keys and offsets are kept in memory until the index is
+        written; the records are written as they come.
+        """
+        f.write(bytes(self.header.size))
+        offset, index = self.header.size, []
+        entries = iter(entries)
+        while True:
+            batch = list(islice(entries, self.batch_size))
+            if not batch:
+                break
+            for key, data in batch:
+                index.append((key, offset, len(data)))
+                offset += len(data)
+            f.write(b"".join(data for key, data in batch))
+        index.sort()
+        width = max((len(key) for key, _, _ in index), default=0)
+        row = struct.Struct("<{}sQI".format(width))
+        f.write(b"".join(row.pack(*entry) for entry in index))
+        f.seek(0)
+        f.write(self.header.pack(self.magic, self.version, len(index),
+                                 width, offset))
+
+    def read(self, f, lazy=False):
+        """Yield the (key, record) entries of the binary file f, by key.
+
+        Records are yielded as JSON text if lazy is True.
+        """
+        snapshot = Snapshot(f)
+        try:
+            for key in snapshot.keys():
+                yield key, snapshot.text(key) if lazy else snapshot.get(key)
+        finally:
+            snapshot.close()
+
+
+class Snapshot:
+    """A read-only view of a file written by SnapshotSerializer.
+
+    The file is mapped in memory: keys are found by binary search in its
+    index and a record is only decoded when it is asked for.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+
+    def __init__(self, f):
+        """Map the snapshot open as the binary file f."""
+        header = SnapshotSerializer.header
+        if os.fstat(f.fileno()).st_size < header.size:
+            raise ValueError("Not an HBNB snapshot")
+        self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.__count, width, self.__index = \
+            header.unpack_from(self.__map)
+        if magic != SnapshotSerializer.magic or \
+                version != SnapshotSerializer.version:
+            self.close()
+            raise ValueError("Unsupported snapshot header")
+        self.__row = struct.Struct("<{}sQI".format(width))
+        self.__keys = _SnapshotKeys(self.__map, self.__index, self.__row,
+                                    self.__count)
+
+    def __len__(self):
+        """Return the number of entries of the snapshot."""
+        return self.__count
+
+    def __contains__(self, key):
+        """Return whether the snapshot holds key."""
+        return self.__find(key) is not None
+
+    def __find(self, key):
+        """Return the (offset, length) of the record of key, or None."""
+        key = key.encode("utf-8")
+        if len(key) > self.__row.size - 12:
+            return None
+        i = bisect_left(self.__keys, key)
+        if i == self.__count or self.__keys[i] != key:
+            return None
+        return self.__row.unpack_from(self.__map,
+                                      self.__index + i * self.__row.size)[1:]
+
+    def text(self, key):
+        """Return the record of key as JSON text, or None."""
+        found = self.__find(key)
+        if found is None:
+            return None
+        offset, length = found
+        return self.__map[offset:offset + length].decode("utf-8")
+
+    def get(self, key):
+        """Return the record of key as a dictionary, or None."""
+        text = self.text(key)
+        return None if text is None else json.loads(text)
+
+    def keys(self, prefix=""):
+        """Yield the keys starting with prefix, such as 'State.', in order."""
+        prefix = prefix.encode("utf-8")
+        i = bisect_left(self.__keys, prefix)
+        while i < self.__count:
+            key = self.__keys[i]
+            if not key.startswith(prefix):
+                return
+            yield key.decode("utf-8")
+            i += 1
+
+    def count(self, prefix=""):
+        """Return the number of keys starting with prefix."""
+        if not prefix:
+            return self.__count
+        prefix = prefix.encode("utf-8")
+        end = prefix[:-1] + bytes([prefix[-1] + 1])
+        return bisect_left(self.__keys, end) - \
+            bisect_left(self.__keys, prefix)
+
+    def close(self):
+        """Unmap the file."""
+        self.__map.close()
+
+
+class _SnapshotKeys:
+    """The sorted keys of a snapshot index, as a sequence for bisect."""
+
+    def __init__(self, buffer, offset, row, count):
+        """Read count rows of row from buffer, starting at offset."""
+        self.__buffer, self.__offset = buffer, offset
+        self.__row, self.__count = row, count
+
+    def __len__(self):
+        """Return the number of keys."""
+        return self.__count
+
+    def __getitem__(self, i):
+        """Return key i, without its padding."""
+        return self.__row.unpack_from(
+            self.__buffer, self.__offset + i * self.__row.size)[0].rstrip(
+                b"\0")
+
+
+SERIALIZERS = {s.name: s for s in (JSONSerializer(), PickleSerializer(),
+                                   SnapshotSerializer())}
+
+
+def get_serializer(name=None):
+    """Return the serializer called name, by default 'HBNB_FILE_FORMAT'.
+
+    Raises:
+        ValueError: If there is no serializer called name.
+    """
+    name = name or getenv("HBNB_FILE_FORMAT") or "json"
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError("Unknown storage format: {}".format(name))
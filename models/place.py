@@ -2,18 +2,18 @@
 """ Place Module for HBNB project """
 from os import getenv
 from sqlalchemy import (Column, Float,
-                        ForeignKey, Integer,
+                        ForeignKey, Index, Integer,
                         String, Table,
                         inspect)
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, compact
 import models
 from models.review import Review
 from models.amenity import Amenity
 
 STORAGE_TYPE = getenv("HBNB_TYPE_STORAGE")
 
-if STORAGE_TYPE and STORAGE_TYPE == "db":
+if STORAGE_TYPE in ("db", "sqlite"):
     # Define the association table
     place_amenity = Table('place_amenity', Base.metadata,
                           Column('place_id', String(60),
@@ -21,16 +21,20 @@ if STORAGE_TYPE and STORAGE_TYPE == "db":
                                  primary_key=True, nullable=False),
                           Column('amenity_id', String(60),
                                  ForeignKey("amenities.id"),
-                                 primary_key=True, nullable=False))
+                                 primary_key=True, nullable=False,
+                                 index=True))
 
 
-if STORAGE_TYPE and STORAGE_TYPE == "db":
+if STORAGE_TYPE in ("db", "sqlite"):
     class Place(BaseModel, Base):
         """ A place to stay
         """
         __tablename__ = "places"
-        city_id = Column(String(60), ForeignKey("cities.id"), nullable=False)
-        user_id = Column(String(60), ForeignKey("users.id"), nullable=False)
+        __table_args__ = (Index("ix_places_name", "name", "id"),)
+        city_id = Column(String(60), ForeignKey("cities.id"), nullable=False,
+                         index=True)
+        user_id = Column(String(60), ForeignKey("users.id"), nullable=False,
+                         index=True)
         name = Column(String(128), nullable=False)
         description = Column(String(1024))
         number_rooms = Column(Integer, default=0)
@@ -39,7 +43,7 @@ if STORAGE_TYPE and STORAGE_TYPE == "db":
         price_by_night = Column(Integer, default=0)
         latitude = Column(Float)
         longitude = Column(Float)
-        if STORAGE_TYPE == 'db':
+        if STORAGE_TYPE in ('db', 'sqlite'):
             reviews = relationship("Review", backref="place",
                                    cascade="all, delete-orphan")
             amenities = relationship("Amenity", secondary="place_amenity",
@@ -54,7 +58,7 @@ if STORAGE_TYPE and STORAGE_TYPE == "db":
             mapper = inspect(cls)
             mapper.confirm_deleted_rows = False
 
-if not STORAGE_TYPE or STORAGE_TYPE != 'db':
+if STORAGE_TYPE not in ("db", "sqlite"):
     class Place(BaseModel):
         """ A place to stay
         """
@@ -77,22 +81,31 @@ if not STORAGE_TYPE or STORAGE_TYPE != 'db':
         @property
         def reviews(self):
             """Get a list of all linked Reviews."""
-            all_reviews = list(models.storage.all(Review).values())
-            review_list = [review for review in all_reviews if
-                           review.place_id == self.id]
-            return review_list
+            return models.storage.lookup(Review, "place_id", self.id)
+
+        @property
+        def user(self):
+            """Get the User owning the Place, or None."""
+            return models.storage.get("User", self.user_id)
 
         @property
         def amenities(self):
             """Get/set linked Amenities."""
-            all_am = list(models.storage.all(Amenity).values())
-            amenity_list = [a for a in all_am if a.id in self.amenity_ids]
-            return amenity_list
+            all_am = models.storage.all(Amenity)
+            keys = ("Amenity." + amenity_id for amenity_id in self.amenity_ids)
+            return [all_am[key] for key in keys if key in all_am]
 
         @amenities.setter
         def amenities(self, value):
             """
             Appends amenities id to amenity_ids list
+
+            A new list is assigned so the class-level default
+            is never shared between instances, and so that the
+            storage indexes the amenities of a stored Place again.
             """
             if type(value) is Amenity:
-                self.amenity_ids.append(value.id)
+                self.amenity_ids = self.amenity_ids + [value.id]
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        Place = compact(Place)
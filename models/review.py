@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """Defines the Review class."""
 from os import getenv
+import models
 from models.base_model import Base
-from models.base_model import BaseModel
+from models.base_model import BaseModel, compact
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 from sqlalchemy import String
@@ -10,7 +11,7 @@ from sqlalchemy import String
 STORAGE_TYPE = getenv("HBNB_TYPE_STORAGE")
 
 
-if STORAGE_TYPE or STORAGE_TYPE == "db":
+if STORAGE_TYPE in ("db", "sqlite"):
     class Review(BaseModel, Base):
         """Represents a review for a MySQL database.
 
@@ -24,9 +25,11 @@ if STORAGE_TYPE or STORAGE_TYPE == "db":
         """
         __tablename__ = "reviews"
         text = Column(String(1024), nullable=False)
-        place_id = Column(String(60), ForeignKey("places.id"), nullable=False)
-        user_id = Column(String(60), ForeignKey("users.id"), nullable=False)
-if not STORAGE_TYPE or STORAGE_TYPE != "db":
+        place_id = Column(String(60), ForeignKey("places.id"), nullable=False,
+                          index=True)
+        user_id = Column(String(60), ForeignKey("users.id"), nullable=False,
+                         index=True)
+if STORAGE_TYPE not in ("db", "sqlite"):
     class Review(BaseModel):
         """Represents a review for a MySQL database.
 
@@ -45,3 +48,11 @@ if not STORAGE_TYPE or STORAGE_TYPE != "db":
         def __init__(self, *args, **kwargs):
             """initializes Place"""
             super().__init__(*args, **kwargs)
+
+        @property
+        def user(self):
+            """Get the User who wrote the Review, or None."""
+            return models.storage.get("User", self.user_id)
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        Review = compact(Review)
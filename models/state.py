@@ -1,14 +1,14 @@
 #!/usr/bin/python3
 """Defines the State class."""
 import models
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, compact
 from models.city import City
 from os import getenv
 
 
-if getenv("HBNB_TYPE_STORAGE") and getenv("HBNB_TYPE_STORAGE") == "db":
+if getenv("HBNB_TYPE_STORAGE") in ("db", "sqlite"):
     class State(BaseModel, Base):
         """Represents a state for a MySQL database.
 
@@ -20,6 +20,7 @@ if getenv("HBNB_TYPE_STORAGE") and getenv("HBNB_TYPE_STORAGE") == "db":
             cities (sqlalchemy relationship): The State-City relationship.
         """
         __tablename__ = "states"
+        __table_args__ = (Index("ix_states_name", "name", "id"),)
         name = Column(String(128), nullable=False)
         cities = relationship("City", backref="state", cascade="all, delete")
 else:
@@ -35,8 +36,7 @@ else:
             This is a getter attribute for FileStorage
                 relationship between State and City.
             """
-            city_list = []
-            for city in models.storage.all(City).values():
-                if city.state_id == self.id:
-                    city_list.append(city)
-            return city_list
+            return models.storage.lookup(City, "state_id", self.id)
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        State = compact(State)
@@ -2,13 +2,13 @@
 """Defines the User class."""
 from os import getenv
 from models.base_model import Base
-from models.base_model import BaseModel
+from models.base_model import BaseModel, compact
 from sqlalchemy import Column
 from sqlalchemy import String
 from sqlalchemy.orm import relationship
 
 
-if getenv("HBNB_TYPE_STORAGE") and getenv("HBNB_TYPE_STORAGE") == "db":
+if getenv("HBNB_TYPE_STORAGE") in ("db", "sqlite"):
     class User(BaseModel, Base):
         """Represents a user for a MySQL database.
 
@@ -38,3 +38,6 @@ else:
         password = ''
         first_name = ''
         last_name = ''
+
+    if getenv("HBNB_FILE_COMPACT") == "1":
+        User = compact(User)
@@ -12,6 +12,8 @@ from models.engine.file_storage import FileStorage
 
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class TestHBNBCommand(unittest.TestCase):
@@ -109,6 +111,17 @@ class TestHBNBCommand(unittest.TestCase):
             self.assertEqual(
                 "** class doesn't exist **\n", f.getvalue())
 
+    def test_create_class_not_evaluated(self):
+        """Test that class names are looked up, never evaluated."""
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.HBNB.do_create("print('evaluated')")
+            self.assertEqual(
+                "** class doesn't exist **\n", f.getvalue())
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.HBNB.do_all("print('evaluated')")
+            self.assertEqual(
+                "** class doesn't exist **\n", f.getvalue())
+
     @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
                      "Testing DBStorage")
     def test_create(self):
@@ -304,5 +317,130 @@ class TestHBNBCommand(unittest.TestCase):
                 "** no instance found **\n", f.getvalue())
 
 
+class TestHBNBCommandRelations(unittest.TestCase):
+    """Unittests for relationships updated through the console."""
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def setUp(self):
+        """Move file.json aside and start from an empty storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        self.saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.HBNB = HBNBCommand()
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def tearDown(self):
+        """Restore the original file.json and objects."""
+        FileStorage._FileStorage__objects = self.saved
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def create(self, line):
+        """Run the create command and return the new id."""
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.HBNB.onecmd("create " + line)
+        return f.getvalue().strip()
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def test_update_city_state_id(self):
+        """Test that State.cities follows an updated City.state_id."""
+        ca_id = self.create('State name="California"')
+        nv_id = self.create('State name="Nevada"')
+        city_id = self.create('City name="Napa" state_id="{}"'.format(ca_id))
+        states = models.storage.all("State")
+        ca = states["State." + ca_id]
+        nv = states["State." + nv_id]
+        self.assertEqual([c.id for c in ca.cities], [city_id])
+        self.HBNB.onecmd('update City {} state_id "{}"'.format(
+            city_id, nv_id))
+        self.assertEqual(ca.cities, [])
+        self.assertEqual([c.id for c in nv.cities], [city_id])
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def test_values_not_evaluated(self):
+        """Test that values are parsed as literals, never evaluated."""
+        code = "globals()"
+        place_id = self.create('Place name="House" number_rooms=2 '
+                               'max_guest=' + code)
+        place = models.storage.get("Place", place_id)
+        self.assertEqual((place.number_rooms, place.max_guest), (2, 0))
+        self.HBNB.onecmd("update Place {} name {}".format(place_id, code))
+        self.HBNB.onecmd("update Place {} number_rooms 4".format(place_id))
+        self.assertEqual(place.name, code)
+        self.assertEqual(place.number_rooms, 4)
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def test_update_review_place_id(self):
+        """Test that Place.reviews follows an updated Review.place_id."""
+        first_id = self.create('Place name="First"')
+        second_id = self.create('Place name="Second"')
+        review_id = self.create('Review text="Nice" place_id="{}"'.format(
+            first_id))
+        places = models.storage.all("Place")
+        first = places["Place." + first_id]
+        second = places["Place." + second_id]
+        self.assertEqual([r.id for r in first.reviews], [review_id])
+        self.HBNB.onecmd('Review.update("{}", "place_id", "{}")'.format(
+            review_id, second_id))
+        self.assertEqual(first.reviews, [])
+        self.assertEqual([r.id for r in second.reviews], [review_id])
+        self.HBNB.onecmd("destroy Review " + review_id)
+        self.assertEqual(second.reviews, [])
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def test_all_query(self):
+        """Test that all filters, sorts and pages instances."""
+        for name, price in (("A", 50), ("B", 150), ("C", 80), ("D", 20)):
+            self.create('Place name="{}" price_by_night={}'.format(
+                name, price))
+
+        def names(line):
+            with patch("sys.stdout", new=StringIO()) as f:
+                self.HBNB.onecmd(line)
+            return [obj.split("'name': '")[1][0]
+                    for obj in eval(f.getvalue())]
+        self.assertEqual(names("all Place price_by_night__lt=100 "
+                               "order_by=-name"), ["D", "C", "A"])
+        self.assertEqual(names("all Place order_by=price_by_night "
+                               "limit=2 offset=1"), ["A", "C"])
+        self.assertEqual(names('all Place name="B"'), ["B"])
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.HBNB.onecmd("all Place size__lt=3")
+            self.assertEqual("** Place has no attribute size **\n",
+                             f.getvalue())
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.HBNB.onecmd("all Place limit=x")
+            self.assertEqual("** limit must be a non-negative integer: "
+                             "'x' **\n", f.getvalue())
+
+    @unittest.skipIf(STORAGE_TYPE and STORAGE_TYPE == 'db',
+                     "Testing DBStorage")
+    def test_all_streamed(self):
+        """Test that all prints the same list as print() would."""
+        for name in ("Napa", "Reno's"):
+            self.create('City name="{}"'.format(name))
+        for line, objs in (("all City", models.storage.all("City")),
+                           ("all", models.storage.all())):
+            with patch("sys.stdout", new=StringIO()) as f:
+                self.HBNB.onecmd(line)
+            self.assertEqual(f.getvalue(), "{}\n".format(
+                [str(obj) for obj in objs.values()]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,13 +3,16 @@
 Unit tests for the BaseModel class.
 """
 
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, compact
 import unittest
 import datetime
 import json
 import os
+from unittest.mock import patch
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class Test_Basemodel(unittest.TestCase):
@@ -120,6 +123,36 @@ class Test_Basemodel(unittest.TestCase):
         base_instance = self.value()
         self.assertEqual(type(base_instance.created_at), datetime.datetime)
 
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_kwargs_no_new_id(self):
+        """Test that no id or datetime is generated when kwargs have them."""
+        copy = self.value().to_dict()
+        with patch('models.base_model.uuid4') as uuid4:
+            new = self.value(**copy)
+        uuid4.assert_not_called()
+        self.assertEqual(new.to_dict(), copy)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_from_dict(self):
+        """Test that from_dict rebuilds an equal instance."""
+        base_instance = self.value()
+        base_instance.first_name = 'Betty'
+        copy = base_instance.to_dict()
+        new = self.value.from_dict(copy)
+        self.assertIs(type(new), self.value)
+        self.assertFalse(new is base_instance)
+        self.assertEqual(new.__dict__, base_instance.__dict__)
+        self.assertEqual(new.to_dict(), copy)
+
+    def test_to_dict_native(self):
+        """Test that to_dict(native=True) keeps datetime objects."""
+        base_instance = self.value()
+        native = base_instance.to_dict(native=True)
+        self.assertIs(native['created_at'], base_instance.created_at)
+        self.assertIs(native['updated_at'], base_instance.updated_at)
+        new = self.value.from_dict(native)
+        self.assertEqual(new.to_dict(), base_instance.to_dict())
+
     @unittest.skipIf(STORAGE_TYPE != 'db', 'Testing FileStorage')
     def test_mapped_to_base(self):
         """
@@ -137,5 +170,61 @@ class Test_Basemodel(unittest.TestCase):
         self.assertFalse(isinstance(b_instance, Base))
 
 
+class Test_Compact(unittest.TestCase):
+    """Test class for the compact variant of the model classes."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Build the compact variant of Place."""
+        from models.place import Place
+        self.base = Place
+        self.value = compact(Place)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_class(self):
+        """Test that the variant keeps the name and the base class."""
+        self.assertEqual(self.value.__name__, 'Place')
+        self.assertTrue(issubclass(self.value, self.base))
+        self.assertIn('price_by_night', self.value.__slots__)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_attributes(self):
+        """Test that attributes live in slots and defaults still apply."""
+        place = self.value(name='House1', number_rooms=3)
+        self.assertEqual(place.__dict__, {})
+        self.assertEqual(place.name, 'House1')
+        self.assertEqual(place.price_by_night, 0)
+        self.assertEqual(place.amenity_ids, [])
+        place.first_name = 'Betty'
+        self.assertEqual(place.__dict__, {'first_name': 'Betty'})
+        with self.assertRaises(AttributeError):
+            place.unknown
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_mutable_default(self):
+        """Test that instances do not share a mutable default."""
+        place = self.value()
+        other = self.value()
+        place.amenity_ids.append('1234')
+        self.assertEqual(place.amenity_ids, ['1234'])
+        self.assertEqual(other.amenity_ids, [])
+        default = next(vars(cls)['amenity_ids'] for cls in self.value.__mro__
+                       if isinstance(vars(cls).get('amenity_ids'), list))
+        self.assertEqual(default, [])
+        self.assertEqual(place.to_dict()['amenity_ids'], ['1234'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_to_dict_and_str(self):
+        """Test that to_dict and str include the slots."""
+        place = self.value(name='House1')
+        plain = self.base(**place.to_dict())
+        self.assertEqual(place.to_dict(), plain.to_dict())
+        self.assertEqual(place.to_dict()['__class__'], 'Place')
+        self.assertIn("'name': 'House1'", str(place))
+        new = self.value.from_dict(place.to_dict())
+        self.assertIs(type(new), self.value)
+        self.assertEqual(new.to_dict(), place.to_dict())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -11,6 +11,8 @@ from models.base_model import BaseModel, Base
 
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class Test_City_File_Storage(unittest.TestCase):
@@ -1,6 +1,11 @@
 #!/usr/bin/python3
 """ Module for testing db_storage """
 import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 from models.base_model import BaseModel, Base
@@ -13,6 +18,48 @@ from models.user import User
 from models.engine.db_storage import DBStorage
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    # The DBStorage tests run on SQLite without a MySQL server
+    STORAGE_TYPE = 'db'
+
+EXPLAIN = """
+from sqlalchemy import event
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+state, user = State(name="Utah"), User(email="a@b.c", password="pw")
+city = City(name="Elko", state_id=state.id)
+place = Place(name="Loft", city_id=city.id, user_id=user.id)
+amenity = Amenity(name="Wifi")
+place.amenities.append(amenity)
+review = Review(text="Nice", place_id=place.id, user_id=user.id)
+storage.bulk_new([state, city, user, place, amenity, review])
+storage.close()
+statements = []
+event.listen(storage.engine, "before_cursor_execute",
+             lambda *args: statements.append(args[2:4]))
+for read in (lambda: storage.query(State, order_by=["name", "id"], limit=50),
+             lambda: storage.query(City, order_by=["name", "id"], limit=50),
+             lambda: storage.query(Amenity, order_by=["name", "id"]),
+             lambda: storage.query(Place, order_by=["name", "id"], limit=50,
+                                   offset=50),
+             lambda: storage.query(City, state_id=state.id),
+             lambda: storage.query(Place, city_id=city.id),
+             lambda: storage.query(Place, user_id=user.id),
+             lambda: storage.query(Review, place_id=place.id),
+             lambda: storage.query(Review, user_id=user.id),
+             lambda: storage.get(Amenity, amenity.id).place_amenities):
+    del statements[:]
+    read()
+    with storage.engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statements[-1][0], statements[-1][1])
+        print(" ".join(row[-1] for row in plan))
+"""
 
 
 class TestDBStorage(unittest.TestCase):
@@ -135,6 +182,76 @@ class TestDBStorage(unittest.TestCase):
         for am in self.place.amenities:
             self.assertEqual(self.amenity, am)
 
+    @unittest.skipIf(not STORAGE_TYPE or STORAGE_TYPE != 'db',
+                     "Testing FILEStorage")
+    def test_get(self):
+        """Test that get() finds an object by class and id."""
+        state = State(name="Nevada")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertIs(self.storage.get('State', state.id), state)
+        self.assertIsNone(self.storage.get(City, state.id))
+        self.assertIsNone(self.storage.get(State, 'missing'))
+        self.assertIsNone(self.storage.get(BaseModel, state.id))
+
+    @unittest.skipIf(not STORAGE_TYPE or STORAGE_TYPE != 'db',
+                     "Testing FILEStorage")
+    def test_count(self):
+        """Test that count() matches the objects returned by all()."""
+        self.assertEqual(self.storage.count(State),
+                         len(self.storage.all(State)))
+        self.assertEqual(self.storage.count('Amenity'),
+                         len(self.storage.all(Amenity)))
+        self.assertEqual(self.storage.count(), len(self.storage.all()))
+        self.assertEqual(self.storage.count(BaseModel), 0)
+
+    @unittest.skipIf(not STORAGE_TYPE or STORAGE_TYPE != 'db',
+                     "Testing FILEStorage")
+    def test_iter_all(self):
+        """Test that iter_all() yields the objects of all(), by batches."""
+        self.assertEqual(
+            sorted(obj.id for obj in self.storage.iter_all(State, 2)),
+            sorted(obj.id for obj in self.storage.all(State).values()))
+        self.assertEqual(sum(1 for obj in self.storage.iter_all(None, 1)),
+                         len(self.storage.all()))
+        self.assertEqual(list(self.storage.iter_all(BaseModel)), [])
+
+    @unittest.skipIf(not STORAGE_TYPE or STORAGE_TYPE != 'db',
+                     "Testing FILEStorage")
+    def test_query(self):
+        """Test that query() filters, sorts and pages in SQL."""
+        state = State(name="Oregon")
+        cities = [City(name=name, state_id=state.id)
+                  for name in ("Salem", "Bend", "Eugene")]
+        for obj in [state] + cities:
+            self.storage.new(obj)
+        self.storage.save()
+
+        def names(**kwargs):
+            return [c.name for c in self.storage.query(City, **kwargs)]
+        self.assertEqual(names(state_id=state.id, order_by="name"),
+                         ["Bend", "Eugene", "Salem"])
+        self.assertEqual(names(state_id=state.id, order_by="-name",
+                               limit=2, offset=1), ["Eugene", "Bend"])
+        self.assertEqual(names(state_id=state.id, name__in=["Bend", "X"]),
+                         ["Bend"])
+        self.assertEqual(names(state_id=state.id, name__gt="C",
+                               order_by="name"), ["Eugene", "Salem"])
+        self.assertEqual(self.storage.query("Galaxy"), [])
+        with self.assertRaises(ValueError):
+            self.storage.query(City, name__like="B")
+        with self.assertRaises(ValueError):
+            self.storage.query(City, load="state.name")
+        for page in ({'limit': -1}, {'offset': -1}, {'limit': '2'},
+                     {'offset': None}, {'limit': True}):
+            with self.assertRaises(ValueError):
+                self.storage.query(City, **page)
+
+        loaded = self.storage.query(State, id=state.id, load="cities")
+        self.assertIn("cities", loaded[0].__dict__)
+        self.assertEqual(len(loaded[0].__dict__["cities"]), 3)
+
     @unittest.skipIf(not STORAGE_TYPE or STORAGE_TYPE != 'db',
                      "Testing FILEStorage")
     def test_delete_a_without_obj(self):
@@ -249,5 +366,191 @@ class TestDBStorageNewSaveReload(unittest.TestCase):
         self.assertIn(self.user, all_users_after_new.values())
 
 
+class TestDBStorageSQLite(unittest.TestCase):
+    """Tests for DBStorage on SQLite, each run in a fresh process."""
+
+    def setUp(self):
+        """Work in an empty directory."""
+        self.tmp = tempfile.mkdtemp()
+        self.env = dict(os.environ, HBNB_TYPE_STORAGE='sqlite',
+                        PYTHONPATH=os.getcwd(),
+                        HBNB_SQLITE_PATH=os.path.join(self.tmp, 'hbnb.db'))
+        self.env.pop('HBNB_ENV', None)
+
+    def tearDown(self):
+        """Remove the database."""
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_code(self, *lines, **env):
+        """Return the output of lines run with the SQLite storage."""
+        return subprocess.run([sys.executable, '-c', '\n'.join(
+            ('from models import storage',) + lines)],
+            env=dict(self.env, **env),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+
+    def test_persists(self):
+        """Test that saved objects and relationships are read back."""
+        self.run_code('from models.city import City',
+                      'from models.state import State',
+                      'state = State(name="California")',
+                      'storage.new(state)',
+                      'storage.new(City(name="Fresno", state_id=state.id))',
+                      'storage.save()').check_returncode()
+        out = self.run_code('print(type(storage).__name__)',
+                            'for state in storage.all("State").values():',
+                            '    print(state.name, state.cities[0].name)')
+        self.assertEqual(out.stdout.split(),
+                         ['DBStorage', 'California', 'Fresno'])
+        self.assertTrue(os.path.exists(self.env['HBNB_SQLITE_PATH']))
+
+    def test_foreign_keys(self):
+        """Test that foreign keys are enforced, as with MySQL."""
+        out = self.run_code('from models.city import City',
+                            'storage.new(City(name="Nowhere", state_id="0"))',
+                            'storage.save()')
+        self.assertNotEqual(out.returncode, 0)
+        self.assertIn('FOREIGN KEY constraint failed', out.stderr)
+
+    def test_session_per_thread(self):
+        """Test that each thread has its own session, discarded by close()."""
+        out = self.run_code('import threading',
+                            'sessions = []',
+                            'session = storage._DBStorage__session',
+                            'thread = threading.Thread(',
+                            '    target=lambda: sessions.append(session()))',
+                            'thread.start()',
+                            'thread.join()',
+                            'print(session() is session())',
+                            'print(session() is not sessions[0])',
+                            'first = session()',
+                            'storage.close()',
+                            'print(session() is not first)')
+        self.assertEqual(out.stdout.split(), ['True'] * 3, out.stderr)
+
+    def test_bulk(self):
+        """Test that bulk_new() and bulk_update() batch rows and commits."""
+        out = self.run_code('from sqlalchemy import event',
+                            'from models.city import City',
+                            'from models.state import State',
+                            'engine = storage._DBStorage__engine',
+                            'statements = []',
+                            'event.listen(engine, "before_cursor_execute",',
+                            '    lambda *args: statements.append(',
+                            '        args[2].split()[0]))',
+                            'event.listen(engine, "commit",',
+                            '    lambda *args: statements.append("COMMIT"))',
+                            'states = [State(name=str(i)) for i in range(5)]',
+                            'objs = [obj for s in states for obj in',
+                            '        (s, City(name="c", state_id=s.id))]',
+                            'storage.bulk_new(objs, batch_size=6)',
+                            'print(*statements)',
+                            'del statements[:]',
+                            'for state in states:',
+                            '    state.name = "Changed"',
+                            'storage.bulk_update(states)',
+                            'print(*statements)',
+                            'storage.close()',
+                            'print(storage.count(City),',
+                            '      storage.query(State, name="Changed",',
+                            '                    limit=1)[0].updated_at ==',
+                            '      states[0].updated_at)')
+        self.assertEqual(out.stdout.splitlines(), [
+            'INSERT INSERT COMMIT INSERT INSERT COMMIT',
+            'UPDATE COMMIT', '5 True'], out.stderr)
+
+    def test_explain(self):
+        """Test that the page and relationship queries use the indexes."""
+        out = self.run_code(EXPLAIN)
+        plans = out.stdout.splitlines()
+        self.assertEqual(len(plans), 10, out.stderr)
+        for plan, index in zip(plans, (
+                'ix_states_name', 'ix_cities_name', 'ix_amenities_name',
+                'ix_places_name', 'ix_cities_state_id', 'ix_places_city_id',
+                'ix_places_user_id', 'ix_reviews_place_id',
+                'ix_reviews_user_id', 'ix_place_amenity_amenity_id')):
+            self.assertIn('INDEX ' + index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_schema_upgrade(self):
+        """Test that the migrations add the indexes to an older database.
+        """
+        def migrate(*args):
+            out = subprocess.run(
+                [sys.executable, '-m', 'models.engine.migrate', 'schema'] +
+                list(args), env=self.env, stdout=subprocess.PIPE,
+                universal_newlines=True, check=True)
+            return out.stdout.splitlines()
+        self.assertEqual(migrate(), ['Schema version 2 of 2'])
+        self.run_code('from models.engine import schema',
+                      'with storage.engine.begin() as connection:',
+                      '    for name in ("ix_states_name",',
+                      '                 "ix_cities_state_id",',
+                      '                 "ix_place_amenity_amenity_id"):',
+                      '        connection.exec_driver_sql(',
+                      '            "DROP INDEX " + name)',
+                      '    connection.execute(',
+                      '        schema.schema_version.delete())'
+                      ).check_returncode()
+        self.assertEqual(migrate(), [
+            'Schema version 0 of 2', 'Pending: Index the foreign keys',
+            'Pending: Index the names pages are sorted by'])
+        self.assertEqual(migrate('upgrade'), [
+            'Applied: Index the foreign keys',
+            'Applied: Index the names pages are sorted by',
+            'Schema version 2 of 2'])
+        self.assertEqual(migrate('upgrade'), ['Schema version 2 of 2'])
+        self.assertIn('INDEX ix_states_name',
+                      self.run_code(EXPLAIN).stdout.splitlines()[0])
+
+    def test_replica(self):
+        """Test that reads go to the replica, writes to the database, and
+        that reads following a write go to the database by default."""
+        self.run_code('from models.state import State',
+                      'storage.new(State(name="Utah"))',
+                      'storage.save()').check_returncode()
+        replica = os.path.join(self.tmp, 'replica.db')
+        with sqlite3.connect(self.env['HBNB_SQLITE_PATH']) as primary, \
+                sqlite3.connect(replica) as copy:
+            primary.backup(copy)
+        out = self.run_code('from models.state import State',
+                            'print(storage.count(State))',
+                            'storage.read_your_writes(False)',
+                            'storage.new(State(name="Iowa"))',
+                            'storage.save()',
+                            'print(storage.count(State))',
+                            'storage.close()',
+                            'storage.new(State(name="Ohio"))',
+                            'storage.save()',
+                            'print(storage.count(State),',
+                            '      len(storage.query(State, name="Ohio")))',
+                            'storage.close()',
+                            'print(storage.count(State))',
+                            HBNB_REPLICA_URL='sqlite:///' + replica)
+        self.assertEqual(out.stdout.splitlines(), ['1', '1', '3 1', '1'],
+                         out.stderr)
+        out = self.run_code('from models.state import State',
+                            'storage.new(State(name="Maine"))',
+                            'storage.save()',
+                            'print(storage.count(State))',
+                            HBNB_REPLICA_URL='sqlite:///' + replica,
+                            HBNB_READ_YOUR_WRITES='0')
+        self.assertEqual(out.stdout.split(), ['1'], out.stderr)
+        self.assertEqual(self.run_code('print(storage.count("State"))')
+                         .stdout.split(), ['4'])
+
+    def test_pool_options(self):
+        """Test that the pool is sized by the HBNB_MYSQL_POOL_* variables."""
+        out = self.run_code('pool = storage._DBStorage__engine.pool',
+                            'print(pool.size(), pool._max_overflow,',
+                            '      pool._recycle, pool._timeout)',
+                            HBNB_MYSQL_POOL_SIZE='3',
+                            HBNB_MYSQL_MAX_OVERFLOW='2',
+                            HBNB_MYSQL_POOL_RECYCLE='600',
+                            HBNB_MYSQL_POOL_TIMEOUT='1.5')
+        self.assertEqual(out.stdout.split(), ['3', '2', '600', '1.5'],
+                         out.stderr)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,18 @@
 #!/usr/bin/python3
 """ Mdule to test file_storage """
+import fcntl
+import io
+import json
 import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from types import MappingProxyType
+from unittest.mock import patch
 from models.base_model import BaseModel
 from models.amenity import Amenity
 from models.city import City
@@ -10,8 +21,14 @@ from models.review import Review
 from models.state import State
 from models.user import User
 from models import storage
+from models.engine.file_storage import FileStorage
+from models.engine.migrate import migrate
+from models.engine.serializers import (JSONSerializer, Snapshot,
+                                       iter_json_lines, iter_json_object)
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class TestFileStorage(unittest.TestCase):
@@ -126,7 +143,7 @@ class TestFileStorage(unittest.TestCase):
         city = City(state_id=state.id)
         place = Place(city_id=city.id, name='House1')
         temp = storage.all(place)
-        self.assertIsInstance(temp, dict)
+        self.assertIsInstance(temp, MappingProxyType)
 
     @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
     def test_place_model_instantiation(self):
@@ -156,7 +173,7 @@ class TestFileStorage(unittest.TestCase):
         place = Place(city_id=city.id, name='House1')
         review = Review(text='wonderful', user_id=user.id, place_id=place.id)
         temp = storage.all(Review)
-        self.assertIsInstance(temp, dict)
+        self.assertIsInstance(temp, MappingProxyType)
 
     @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
     def test_review_model_instantiation(self):
@@ -180,7 +197,7 @@ class TestFileStorage(unittest.TestCase):
         """Test that __objects is properly returned."""
         amenity = Amenity(name='wifi')
         temp = storage.all(Amenity)
-        self.assertIsInstance(temp, dict)
+        self.assertIsInstance(temp, MappingProxyType)
 
     @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
     def test_amenity_model_instantiation(self):
@@ -260,5 +277,1154 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(type(storage), FileStorage)
 
 
+class FileStorageTestCase(unittest.TestCase):
+    """Base class of the tests starting from an empty FileStorage.
+
+    file.json is moved aside during each test, and restored after it.
+
+    Attributes:
+        env (dict): The environment variables set during each test.
+        files (tuple): The files (or directories) the tests may write,
+            besides file.json, removed after each test.
+    """
+
+    env = {}
+    files = ()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Move file.json aside, set env and empty the storage."""
+        try:
+            os.rename('file.json', 'tmp.json')
+        except Exception:
+            pass
+        self.saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.environ = patch.dict(os.environ, self.env)
+        self.environ.start()
+        self.storage = FileStorage()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def tearDown(self):
+        """Remove the files written, restore file.json, env and objects."""
+        self.environ.stop()
+        FileStorage._FileStorage__objects = self.saved
+        for path in ('file.json',) + self.files:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
+        try:
+            os.rename('tmp.json', 'file.json')
+        except Exception:
+            pass
+
+
+class TestFileStorageJournal(FileStorageTestCase):
+    """Unit tests for the journaled mode of FileStorage."""
+
+    env = {'HBNB_FILE_JOURNAL': '1', 'HBNB_FILE_JOURNAL_MAX': '5'}
+    files = ('file.json.journal',)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_save_appends_to_journal(self):
+        """Test that save only appends the changed objects."""
+        state = State(name='California')
+        self.storage.new(state)
+        self.storage.save()
+        self.assertFalse(os.path.exists('file.json'))
+        with open('file.json.journal') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn(state.id, lines[0])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_replays_journal(self):
+        """Test that reload applies new and deleted objects."""
+        kept = State(name='California')
+        gone = State(name='Nevada')
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        self.storage.delete(gone)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertIn('State.' + kept.id, objs)
+        self.assertNotIn('State.' + gone.id, objs)
+        self.assertEqual(objs['State.' + kept.id].name, 'California')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_compaction(self):
+        """Test that a full journal is folded into file.json."""
+        states = [State(name=str(i)) for i in range(6)]
+        for state in states:
+            self.storage.new(state)
+            self.storage.save()
+        self.assertFalse(os.path.exists('file.json'))
+        self.storage.new(states[0])
+        self.storage.save()
+        self.assertTrue(os.path.exists('file.json'))
+        self.assertFalse(os.path.exists('file.json.journal'))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(len(self.storage.all()), 6)
+
+
+class TestFileStorageClassIndex(FileStorageTestCase):
+    """Unit tests for the per-class index behind FileStorage.all(cls)."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class(self):
+        """Test that all(cls) only returns objects of cls."""
+        state = State(name='California')
+        city = City(state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.assertEqual(self.storage.all(State),
+                         {'State.' + state.id: state})
+        self.assertEqual(self.storage.all('City'), {'City.' + city.id: city})
+        self.assertEqual(self.storage.all(Review), {})
+        self.assertEqual(self.storage.all('Galaxy'), {})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class_read_only(self):
+        """Test that all(cls) cannot be changed by the caller."""
+        states = [State(name=str(i)) for i in range(2)]
+        for state in states:
+            self.storage.new(state)
+        objs = self.storage.all(State)
+        with self.assertRaises(TypeError):
+            objs['State.1234'] = states[0]
+        with self.assertRaises(TypeError):
+            del objs['State.' + states[0].id]
+        with self.assertRaises(TypeError):
+            self.storage.all(Review)['Review.1234'] = states[0]
+        with self.assertRaises(RuntimeError):
+            for state in objs.values():
+                self.storage.delete(state)
+        for state in self.storage.iter_all(State):
+            self.storage.delete(state)
+        self.assertEqual(self.storage.all(State), {})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class_follows(self):
+        """Test that all(cls) follows the objects stored after it."""
+        reviews = self.storage.all(Review)
+        states = self.storage.all('State')
+        review = Review(text='Nice')
+        state = State(name='California')
+        self.storage.new(review)
+        self.storage.new(state)
+        self.assertEqual(reviews, {'Review.' + review.id: review})
+        self.assertEqual(states, {'State.' + state.id: state})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class_after_delete(self):
+        """Test that deleted objects leave the index."""
+        state = State(name='California')
+        self.storage.new(state)
+        self.storage.delete(state)
+        self.assertEqual(self.storage.all(State), {})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class_direct_changes(self):
+        """Test that the index follows changes made on __objects."""
+        state = State(name='California')
+        self.storage.new(state)
+        del self.storage.all()['State.' + state.id]
+        self.assertEqual(self.storage.all(State), {})
+        FileStorage._FileStorage__objects = {'State.' + state.id: state}
+        self.assertEqual(self.storage.all(State),
+                         {'State.' + state.id: state})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_get(self):
+        """Test that get() finds an object by class and id."""
+        state = State(name='California')
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertIs(self.storage.get('State', state.id), state)
+        self.assertIsNone(self.storage.get(City, state.id))
+        self.assertIsNone(self.storage.get(State, 'missing'))
+        self.storage.delete(state)
+        self.assertIsNone(self.storage.get(State, state.id))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_count(self):
+        """Test that count() counts the objects of a class or all."""
+        self.assertEqual(self.storage.count(), 0)
+        state = State(name='California')
+        for obj in (state, City(state_id=state.id), City(state_id=state.id)):
+            self.storage.new(obj)
+        self.assertEqual(self.storage.count(City), 2)
+        self.assertEqual(self.storage.count('State'), 1)
+        self.assertEqual(self.storage.count(Review), 0)
+        self.assertEqual(self.storage.count(), 3)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_iter_all(self):
+        """Test that iter_all() yields all() in order, changes allowed."""
+        state = State(name='California')
+        for obj in (state, City(state_id=state.id), City(state_id=state.id)):
+            self.storage.new(obj)
+        self.assertEqual(list(self.storage.iter_all('City')),
+                         list(self.storage.all(City).values()))
+        objs = []
+        for obj in self.storage.iter_all():
+            objs.append(obj)
+            self.storage.delete(obj)
+        self.assertEqual(len(objs), 3)
+        self.assertEqual(self.storage.count(), 0)
+
+
+class TestFileStorageRelations(FileStorageTestCase):
+    """Unit tests for the reference indexes behind relationships."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_state_cities(self):
+        """Test that State.cities follows new, updated and deleted cities."""
+        ca = State(name='California')
+        nv = State(name='Nevada')
+        city = City(name='Napa', state_id=ca.id)
+        for obj in (ca, nv, city):
+            self.storage.new(obj)
+        self.assertEqual(ca.cities, [city])
+        self.assertEqual(nv.cities, [])
+        city.state_id = nv.id
+        self.storage.new(city)
+        self.assertEqual(ca.cities, [])
+        self.assertEqual(nv.cities, [city])
+        self.storage.delete(city)
+        self.assertEqual(nv.cities, [])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reference_set(self):
+        """Test that relationships follow references set without save."""
+        ca = State(name='California')
+        nv = State(name='Nevada')
+        city = City(name='Napa', state_id=ca.id)
+        for obj in (ca, nv, city):
+            self.storage.new(obj)
+        city.state_id = nv.id
+        self.assertEqual(ca.cities, [])
+        self.assertEqual(nv.cities, [city])
+        self.assertEqual(self.storage.query(City, state_id=nv.id), [city])
+        wifi = Amenity(name='Wifi')
+        place = Place(name='House1', amenity_ids=[wifi.id])
+        for obj in (wifi, place):
+            self.storage.new(obj)
+        self.assertEqual(wifi.place_amenities, [place])
+        place.amenity_ids.remove(wifi.id)
+        self.assertEqual(wifi.place_amenities, [])
+        place.amenity_ids.append(wifi.id)
+        self.assertEqual(wifi.place_amenities, [place])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_place_reviews(self):
+        """Test that Place.reviews only lists the reviews of the place."""
+        place = Place(name='House1')
+        other = Place(name='House2')
+        review = Review(text='wonderful', place_id=place.id)
+        for obj in (place, other, review):
+            self.storage.new(obj)
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(other.reviews, [])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_place_amenities(self):
+        """Test the Place/Amenity links in both directions."""
+        wifi = Amenity(name='Wifi')
+        pool = Amenity(name='Pool')
+        place = Place(name='House1')
+        other = Place(name='House2')
+        place.amenities = wifi
+        for obj in (wifi, pool, place, other):
+            self.storage.new(obj)
+        self.assertEqual(place.amenities, [wifi])
+        self.assertEqual(other.amenities, [])
+        self.assertEqual(wifi.place_amenities, [place])
+        self.assertEqual(pool.place_amenities, [])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_lookup_unindexed(self):
+        """Test that lookup also answers attributes without an index."""
+        user = User(email='a@b.c', first_name='Betty')
+        self.storage.new(user)
+        self.assertEqual(self.storage.lookup(User, 'first_name', 'Betty'),
+                         [user])
+
+
+class TestFileStorageQuery(FileStorageTestCase):
+    """Unit tests for FileStorage.query()."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Store a few Places in two Cities."""
+        super().setUp()
+        self.napa = City(name='Napa')
+        self.reno = City(name='Reno')
+        self.places = {}
+        for name, city, price in (('A', self.napa, 50), ('B', self.napa, 150),
+                                  ('C', self.reno, 80), ('D', self.napa, 50)):
+            place = Place(name=name, city_id=city.id, price_by_night=price)
+            self.places[name] = place
+            self.storage.new(place)
+
+    def names(self, *args, **kwargs):
+        """Return the names of the Places returned by query()."""
+        return [p.name for p in self.storage.query(Place, *args, **kwargs)]
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_filters(self):
+        """Test the filters and their operators."""
+        self.assertEqual(self.names(city_id=self.napa.id,
+                                    price_by_night__lt=100), ['A', 'D'])
+        self.assertEqual(self.names(price_by_night__ge=80), ['B', 'C'])
+        self.assertEqual(self.names(name__in=['C', 'B']), ['B', 'C'])
+        self.assertEqual(self.names(name__ne='A', price_by_night=50), ['D'])
+        self.assertEqual(self.names(id=self.places['C'].id), ['C'])
+        self.assertEqual(self.names(id='missing'), [])
+        self.assertEqual(self.storage.query('Place', name='A'),
+                         [self.places['A']])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_index(self):
+        """Test that equality on a reference is answered from the index."""
+        with patch.object(FileStorage, 'all') as all_objects:
+            self.assertEqual(self.names(city_id=self.reno.id), ['C'])
+        all_objects.assert_not_called()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_uncomparable(self):
+        """Test that values that cannot be compared do not match."""
+        self.places['B'].latitude = None
+        self.assertEqual(self.names(latitude__lt=1.0), ['A', 'C', 'D'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_order_limit_offset(self):
+        """Test the ordering, limit and offset."""
+        self.assertEqual(self.names(order_by='-name'), ['D', 'C', 'B', 'A'])
+        self.assertEqual(self.names(order_by=['price_by_night', '-name']),
+                         ['D', 'A', 'C', 'B'])
+        self.assertEqual(self.names(order_by='price_by_night', limit=2),
+                         ['A', 'D'])
+        self.assertEqual(self.names(order_by='-price_by_night', limit=2,
+                                    offset=1), ['C', 'A'])
+        self.assertEqual(self.names(order_by='name', offset=3), ['D'])
+        self.assertEqual(self.names(limit=0), [])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_invalid(self):
+        """Test that unknown operators and attributes are refused."""
+        for kwargs in ({'name__like': 'A'}, {'size': 3},
+                       {'order_by': 'size'}, {'_FileStorage__objects': {}},
+                       {'load': ['reviews', 'size.user']}, {'limit': -1},
+                       {'offset': -1}, {'limit': '2'}, {'offset': None},
+                       {'limit': True}):
+            with self.assertRaises(ValueError):
+                self.storage.query(Place, **kwargs)
+        self.assertEqual(self.storage.query('Galaxy'), [])
+
+
+class TestFileStorageBulk(FileStorageTestCase):
+    """Unit tests for FileStorage.bulk_new() and bulk_update()."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_bulk_new_update(self):
+        """Test that the objects are written with a single save()."""
+        states = [State(name=str(i)) for i in range(5)]
+        with patch.object(FileStorage, 'save',
+                          wraps=self.storage.save) as save:
+            self.storage.bulk_new(iter(states), batch_size=2)
+            self.assertEqual(save.call_count, 1)
+            for state in states:
+                state.name = 'Changed'
+            self.storage.bulk_update(states)
+            self.assertEqual(save.call_count, 2)
+        self.assertEqual(len({s.updated_at for s in states}), 1)
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        reloaded = self.storage.all(State)
+        self.assertEqual(len(reloaded), 5)
+        for state in states:
+            self.assertEqual(reloaded['State.' + state.id].to_dict(),
+                             state.to_dict())
+
+
+class TestIterJsonObject(unittest.TestCase):
+    """Unit tests for the streaming parser used by FileStorage.reload."""
+
+    def test_entries(self):
+        """Test that every entry is parsed, whatever the chunk size."""
+        content = {"State.1": {"name": "Cal}ifornia", "ids": [1, {}]},
+                   "City.2": {}, "Place.3": {"price": 12345}}
+        text = json.dumps(content, indent=2)
+        for chunk_size in (1, 3, 16, 65536):
+            entries = iter_json_object(io.StringIO(text), chunk_size)
+            self.assertEqual(dict(entries), content)
+
+    def test_empty_object(self):
+        """Test that an empty object yields no entries."""
+        self.assertEqual(list(iter_json_object(io.StringIO(" {\n} "))), [])
+
+    def test_lines(self):
+        """Test that line-delimited values are yielded as JSON text."""
+        text = '{\n"a": {"x": 1},\n"b": {"y": "z"}\n}\n'
+        self.assertEqual(list(iter_json_lines(io.StringIO(text))),
+                         [("a", '{"x": 1}'), ("b", '{"y": "z"}')])
+        single = io.StringIO(json.dumps({"a": {"x": 1}}))
+        self.assertEqual(list(iter_json_lines(single)), [("a", {"x": 1})])
+        with self.assertRaises(ValueError):
+            list(iter_json_lines(io.StringIO('{\n"a": {"x": 1}\n')))
+
+    def test_lines_indented(self):
+        """Test that files not written one entry per line are parsed."""
+        content = {"a": {"x": 1}, "b": {"y": "z"}}
+        indented = io.StringIO(json.dumps(content, indent=4))
+        self.assertEqual(dict(iter_json_lines(indented)), content)
+        mixed = io.StringIO('{\n"a": {"x": 1},\n"b": {\n"y": "z"}\n}\n')
+        self.assertEqual(dict(iter_json_lines(mixed)), content)
+        for text in ('{\n"a": {"x": 1}, "b": 2\n}', '{\n"a": 1\n}'):
+            self.assertEqual(list(iter_json_lines(io.StringIO(text)))[-1],
+                             json.loads(text).popitem())
+
+    def test_invalid(self):
+        """Test that invalid content raises a ValueError."""
+        for text in ("", "[]", '{"a": 1', '{"a": 1,}', '{"a" 1}'):
+            with self.assertRaises(ValueError):
+                list(iter_json_object(io.StringIO(text), 2))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_save_one_entry_per_line(self):
+        """Test that saved files hold one object per line."""
+        saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.rename('file.json', 'tmp.json')
+        except Exception:
+            pass
+        try:
+            states = [State(name=str(i)) for i in range(3)]
+            for state in states:
+                storage.new(state)
+            storage.save()
+            with open('file.json') as f:
+                lines = f.read().splitlines()
+                f.seek(0)
+                content = json.load(f)
+            self.assertEqual(len(lines), 5)
+            self.assertEqual(content['State.' + states[1].id],
+                             states[1].to_dict())
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(len(storage.all(State)), 3)
+        finally:
+            FileStorage._FileStorage__objects = saved
+            os.remove('file.json')
+            try:
+                os.rename('tmp.json', 'file.json')
+            except Exception:
+                pass
+
+
+class TestFileStorageLazy(FileStorageTestCase):
+    """Unit tests for the lazy mode of FileStorage."""
+
+    env = {'HBNB_FILE_LAZY': '1'}
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Save a few related objects, then reload them lazily."""
+        super().setUp()
+        self.state = State(name='California')
+        self.city = City(name='Napa', state_id=self.state.id)
+        self.place = Place(name='House1', city_id=self.city.id)
+        for obj in (self.state, self.city, self.place):
+            self.storage.new(obj)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+
+    def loaded(self):
+        """Return the keys of the objects instantiated so far."""
+        return set(FileStorage._FileStorage__objects)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_creates_nothing(self):
+        """Test that reload does not instantiate any object."""
+        self.assertEqual(self.loaded(), set())
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_indented(self):
+        """Test that an indented file.json is reloaded lazily."""
+        with open('file.json') as f:
+            content = json.load(f)
+        with open('file.json', 'w') as f:
+            json.dump(content, f, indent=4)
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         'California')
+        self.assertEqual(self.storage.count(), 3)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all_by_class(self):
+        """Test that all(cls) only instantiates objects of cls."""
+        states = self.storage.all(State)
+        self.assertEqual(list(states), ['State.' + self.state.id])
+        self.assertEqual(states['State.' + self.state.id].name, 'California')
+        self.assertEqual(self.loaded(), {'State.' + self.state.id})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_relationship(self):
+        """Test that relationships only instantiate the related objects."""
+        state = self.storage.all(State)['State.' + self.state.id]
+        self.assertEqual([c.id for c in state.cities], [self.city.id])
+        self.assertNotIn('Place.' + self.place.id, self.loaded())
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_get_count(self):
+        """Test that get() only instantiates the object asked for, and
+        count() none."""
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.loaded(), set())
+        city = self.storage.get(City, self.city.id)
+        self.assertEqual(city.name, 'Napa')
+        self.assertEqual(self.loaded(), {'City.' + self.city.id})
+        self.assertIs(self.storage.all(City)['City.' + self.city.id], city)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_all(self):
+        """Test that all() instantiates every object."""
+        self.assertEqual(len(self.storage.all()), 3)
+        self.assertIsInstance(self.storage.all()['Place.' + self.place.id],
+                              Place)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_save_and_delete(self):
+        """Test that records not instantiated are saved and deleted."""
+        self.storage.delete(self.place)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(set(self.storage.all()),
+                         {'State.' + self.state.id, 'City.' + self.city.id})
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestFileStoragePickle(FileStorageTestCase):
+    """Unit tests for the pickle format of FileStorage."""
+
+    env = {'HBNB_FILE_FORMAT': 'pickle'}
+    files = ('file.pickle', 'file.pickle.journal')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_save_reload(self):
+        """Test that objects survive a save and reload in pickle."""
+        state = State(name='California')
+        place = Place(name='House1', amenity_ids=['a', 'b'])
+        self.storage.new(state)
+        self.storage.new(place)
+        self.storage.save()
+        self.assertTrue(os.path.exists('file.pickle'))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        reloaded = self.storage.all()['State.' + state.id]
+        self.assertEqual(reloaded.to_dict(), state.to_dict())
+        reloaded = self.storage.all()['Place.' + place.id]
+        self.assertEqual(reloaded.amenity_ids, ['a', 'b'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_lazy(self):
+        """Test that pickled records can be reloaded lazily."""
+        state = State(name='California')
+        self.storage.new(state)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.dict(os.environ, {'HBNB_FILE_LAZY': '1'}):
+            self.storage.reload()
+            self.assertEqual(FileStorage._FileStorage__objects, {})
+            states = self.storage.all(State)
+        self.assertEqual(states['State.' + state.id].name, 'California')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_rejects_globals(self):
+        """Test that a file pickling a global is not loaded."""
+        with open('file.pickle', 'wb') as f:
+            pickle.dump({'format': 'hbnb', 'version': 1, 'classes': []}, f)
+            pickle.dump([('State.1', os.system)], f)
+        with self.assertRaises(pickle.UnpicklingError):
+            self.storage.reload()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_rejects_header(self):
+        """Test that files without a matching header are not loaded."""
+        for header in ({'format': 'hbnb', 'version': 99, 'classes': []},
+                       {'format': 'hbnb', 'version': 1,
+                        'classes': ['Unknown']},
+                       ('State.1', {})):
+            with open('file.pickle', 'wb') as f:
+                pickle.dump(header, f)
+            with self.assertRaises(ValueError):
+                self.storage.reload()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_unknown_format(self):
+        """Test that an unknown format is refused."""
+        with patch.dict(os.environ, {'HBNB_FILE_FORMAT': 'xml'}):
+            with self.assertRaises(ValueError):
+                self.storage.save()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_migrate(self):
+        """Test that migrate converts file.json to file.pickle."""
+        state = State(name='California')
+        self.storage.new(state)
+        with patch.dict(os.environ, {'HBNB_FILE_FORMAT': 'json'}):
+            try:
+                os.rename('file.json', 'tmp.json')
+            except Exception:
+                pass
+            try:
+                self.storage.save()
+                self.assertEqual(migrate('pickle'), 'file.pickle')
+            finally:
+                os.remove('file.json')
+                try:
+                    os.rename('tmp.json', 'file.json')
+                except Exception:
+                    pass
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.all(State)['State.' + state.id].name,
+                         'California')
+
+
+class TestFileStorageDurability(FileStorageTestCase):
+    """Unit tests for the atomic saves and the fsync policy."""
+
+    files = ('file.json.journal',)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Save one object."""
+        super().setUp()
+        self.storage.new(State(name='California'))
+        self.storage.save()
+
+    def fsyncs(self, policy, saves=3, journal='0'):
+        """Return the number of os.fsync calls made by saves saves."""
+        env = {'HBNB_FILE_FSYNC': policy, 'HBNB_FILE_JOURNAL': journal}
+        with patch.dict(os.environ, env), \
+                patch('models.engine.file_storage.os.fsync') as fsync:
+            for i in range(saves):
+                self.storage.new(State(name=str(i)))
+                self.storage.save()
+        return fsync.call_count
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_failed_save_keeps_file(self):
+        """Test that a save failing midway leaves file.json intact."""
+        with open('file.json') as f:
+            before = f.read()
+        self.storage.new(State(name='Nevada'))
+        with patch.object(JSONSerializer, 'record',
+                          side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self.storage.save()
+        with open('file.json') as f:
+            self.assertEqual(f.read(), before)
+        self.assertFalse(os.path.exists('file.json.tmp'))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_fsync_policies(self):
+        """Test that each policy flushes the files it should."""
+        self.assertEqual(self.fsyncs('never'), 0)
+        self.assertEqual(self.fsyncs('always'), 6)
+        self.assertEqual(self.fsyncs('always', journal='1'), 3)
+        FileStorage._FileStorage__synced_at = 0.0
+        self.assertEqual(self.fsyncs('60000', journal='1'), 1)
+        with patch('models.engine.file_storage.os.fsync') as fsync:
+            self.storage.flush()
+        self.assertEqual(fsync.call_count, 2)
+        self.assertEqual(self.fsyncs('0', journal='1'), 3)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_deferred_flush(self):
+        """Test that a save not flushed is flushed after the interval."""
+        FileStorage._FileStorage__synced_at = 0.0
+        with patch.dict(os.environ, {'HBNB_FILE_FSYNC': '500'}), \
+                patch('models.engine.file_storage.os.fsync') as fsync:
+            for name in ('Nevada', 'Utah'):
+                self.storage.new(State(name=name))
+                self.storage.save()
+            self.assertEqual(fsync.call_count, 2)
+            timer = FileStorage._FileStorage__flush_timer
+            self.assertTrue(timer.is_alive())
+            timer.join(5)
+        self.assertEqual(fsync.call_count, 4)
+        self.assertEqual(FileStorage._FileStorage__unsynced, set())
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_invalid_policy(self):
+        """Test that an invalid policy is refused."""
+        with self.assertRaises(ValueError):
+            self.fsyncs('sometimes')
+
+
+class TestFileStorageDirty(FileStorageTestCase):
+    """Unit tests for the reuse of unchanged entries by save()."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Save a few objects."""
+        super().setUp()
+        self.states = [State(name=str(i)) for i in range(5)]
+        for state in self.states:
+            self.storage.new(state)
+        self.storage.save()
+
+    def encoded(self, save=None):
+        """Return the objects encoded by save (default storage.save)."""
+        with patch.object(JSONSerializer, 'record',
+                          autospec=True,
+                          side_effect=lambda self, obj: obj.to_dict()) as rec:
+            (save or self.storage.save)()
+        return [call.args[1] for call in rec.call_args_list]
+
+    def stored(self):
+        """Return the records of file.json by key."""
+        with open('file.json') as f:
+            return json.load(f)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_unchanged(self):
+        """Test that a save without changes encodes nothing."""
+        self.assertEqual(self.encoded(), [])
+        self.assertEqual(len(self.stored()), 5)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_changed(self):
+        """Test that only the objects saved, added or deleted are written."""
+        self.states[0].name = 'Nevada'
+        self.assertEqual(self.encoded(self.states[0].save), [self.states[0]])
+        self.assertEqual(self.stored()['State.' + self.states[0].id]['name'],
+                         'Nevada')
+        self.storage.delete(self.states[1])
+        new = State(name='Utah')
+        self.storage.new(new)
+        self.assertEqual(self.encoded(), [new])
+        stored = self.stored()
+        self.assertNotIn('State.' + self.states[1].id, stored)
+        self.assertEqual(len(stored), 5)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload(self):
+        """Test that objects replaced by reload() are encoded again."""
+        with open('file.json') as f:
+            text = f.read()
+        with open('file.json', 'w') as f:
+            f.write(text.replace('"name": "0"', '"name": "Nevada"'))
+        self.storage.reload()
+        self.assertEqual(self.encoded(), list(self.storage.all().values()))
+        self.assertEqual(self.stored()['State.' + self.states[0].id]['name'],
+                         'Nevada')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_place_amenities(self):
+        """Test that linking an Amenity marks a stored Place changed."""
+        place = Place(name='House1')
+        amenity = Amenity(name='Wifi')
+        self.storage.new(place)
+        self.storage.save()
+        place.amenities = amenity
+        self.assertEqual(self.encoded(), [place])
+        self.assertEqual(self.storage.lookup(Place, 'amenity_ids',
+                                             amenity.id), [place])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_attribute_set(self):
+        """Test that an attribute set without obj.save() is saved."""
+        self.states[0].name = 'Nevada'
+        self.assertEqual(self.encoded(), [self.states[0]])
+        self.storage.reload()
+        state = self.storage.get(State, self.states[0].id)
+        self.assertIsNot(state, self.states[0])
+        self.assertEqual(state.name, 'Nevada')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_list_changed_in_place(self):
+        """Test that a list attribute changed in place is saved."""
+        place = Place(name='House1', amenity_ids=['1234'])
+        self.storage.new(place)
+        self.storage.save()
+        place.amenity_ids.append('5678')
+        self.assertEqual(self.encoded(), [place])
+        self.assertEqual(self.stored()['Place.' + place.id]['amenity_ids'],
+                         ['1234', '5678'])
+
+
+class TestFileStorageSharded(FileStorageTestCase):
+    """Unit tests for the sharded layout of FileStorage."""
+
+    env = {'HBNB_FILE_LAYOUT': 'sharded'}
+    files = ('file_storage', 'file_storage.journal')
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Save a few objects in the sharded layout."""
+        super().setUp()
+        self.state = State(name='California')
+        self.city = City(name='Napa', state_id=self.state.id)
+        for obj in (self.state, self.city):
+            self.storage.new(obj)
+        self.storage.save()
+
+    def written(self):
+        """Return the shards written by one save()."""
+        with patch('models.engine.file_storage.os.replace',
+                   side_effect=os.replace) as replace:
+            self.storage.save()
+        return sorted(os.path.basename(call.args[1])
+                      for call in replace.call_args_list)
+
+    def reload(self):
+        """Reload the shards into an empty storage."""
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_one_file_per_class(self):
+        """Test that each class is saved to its own file."""
+        self.assertEqual(sorted(os.listdir('file_storage')),
+                         ['City.json', 'State.json'])
+        with open(os.path.join('file_storage', 'State.json')) as f:
+            self.assertEqual(list(json.load(f)), ['State.' + self.state.id])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_save_changed_shards(self):
+        """Test that save() only rewrites the shards of changed classes."""
+        self.assertEqual(self.written(), [])
+        self.storage.new(Amenity(name='Wifi'))
+        self.assertEqual(self.written(), ['Amenity.json'])
+        self.city.name = 'Sonoma'
+        self.storage.new(self.city)
+        self.storage.delete(self.state)
+        self.assertEqual(self.written(), ['City.json'])
+        self.assertEqual(sorted(os.listdir('file_storage')),
+                         ['Amenity.json', 'City.json'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_on_demand(self):
+        """Test that a shard is only read when its class is reached."""
+        self.reload()
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        state = self.storage.all(State)['State.' + self.state.id]
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ['State.' + self.state.id])
+        self.assertEqual([c.id for c in state.cities], [self.city.id])
+        self.assertEqual(len(self.storage.all()), 2)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_get_reads_one_shard(self):
+        """Test that get() and count() only read the shard of the class."""
+        self.reload()
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         'California')
+        self.assertEqual(sorted(FileStorage._FileStorage__objects),
+                         ['City.' + self.city.id, 'State.' + self.state.id])
+        self.assertIsNone(self.storage.get(User, self.state.id))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_new_before_read(self):
+        """Test that adding to a shard not read yet keeps its objects."""
+        self.reload()
+        self.storage.new(State(name='Nevada'))
+        self.storage.save()
+        self.reload()
+        self.assertEqual(len(self.storage.all(State)), 2)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_journal(self):
+        """Test that journaled changes are replayed on their shards."""
+        with patch.dict(os.environ, {'HBNB_FILE_JOURNAL': '1'}):
+            self.storage.new(State(name='Nevada'))
+            self.storage.delete(self.city)
+            self.storage.save()
+            self.assertTrue(os.path.exists('file_storage.journal'))
+            self.reload()
+            self.assertEqual(len(self.storage.all(State)), 2)
+            self.assertEqual(self.storage.all(City), {})
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_migrate(self):
+        """Test that migrate converts file.json to shards and back."""
+        shutil.rmtree('file_storage')
+        try:
+            os.rename('file.json', 'tmp.json')
+        except Exception:
+            pass
+        try:
+            with patch.dict(os.environ, {'HBNB_FILE_LAYOUT': 'single'}):
+                self.storage.save()
+                self.assertEqual(migrate('json', 'sharded'), 'file_storage')
+            self.reload()
+            self.assertEqual(len(self.storage.all()), 2)
+            os.remove('file.json')
+            self.assertEqual(migrate('json', 'single'), 'file.json')
+            with open('file.json') as f:
+                self.assertEqual(len(json.load(f)), 2)
+        finally:
+            os.remove('file.json')
+            try:
+                os.rename('tmp.json', 'file.json')
+            except Exception:
+                pass
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_unknown_layout(self):
+        """Test that an unknown layout is refused."""
+        with patch.dict(os.environ, {'HBNB_FILE_LAYOUT': 'striped'}):
+            with self.assertRaises(ValueError):
+                self.storage.reload()
+
+
+class TestFileStorageSnapshot(FileStorageTestCase):
+    """Unit tests for the memory-mapped snapshot format of FileStorage."""
+
+    env = {'HBNB_FILE_FORMAT': 'snapshot'}
+    files = ('file.snapshot',)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Save a few related objects to file.snapshot and reload them."""
+        super().setUp()
+        self.state = State(name='California')
+        self.city = City(name='Napa', state_id=self.state.id)
+        self.user = User(email='a@b.c', password='pw')
+        for obj in (self.state, self.city, self.user):
+            self.storage.new(obj)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+
+    def loaded(self):
+        """Return the keys of the objects instantiated so far."""
+        return set(FileStorage._FileStorage__objects)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_snapshot(self):
+        """Test that Snapshot finds and decodes single records."""
+        with open('file.snapshot', 'rb') as f:
+            snapshot = Snapshot(f)
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(list(snapshot.keys('State.')),
+                         ['State.' + self.state.id])
+        self.assertIn('City.' + self.city.id, snapshot)
+        self.assertNotIn('City.' + self.state.id, snapshot)
+        self.assertEqual(snapshot.get('User.' + self.user.id),
+                         self.user.to_dict())
+        self.assertIsNone(snapshot.get('User.' + 'x' * 100))
+        self.assertEqual(snapshot.count('City.'), 1)
+        self.assertEqual(snapshot.count('Place.'), 0)
+        self.assertEqual(snapshot.count(), 3)
+        snapshot.close()
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_reload_decodes_on_access(self):
+        """Test that classes are only decoded when reached."""
+        self.assertEqual(self.loaded(), set())
+        state = self.storage.all(State)['State.' + self.state.id]
+        self.assertEqual(state.name, 'California')
+        self.assertEqual(self.loaded(), {'State.' + self.state.id})
+        self.assertEqual([c.name for c in state.cities], ['Napa'])
+        self.assertNotIn('User.' + self.user.id, self.loaded())
+        self.assertEqual(len(self.storage.all()), 3)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_get_count(self):
+        """Test that get() only decodes the record asked for, and count()
+        none."""
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(State), 1)
+        user = self.storage.get(User, self.user.id)
+        self.assertEqual(user.email, 'a@b.c')
+        self.assertEqual(self.loaded(), {'User.' + self.user.id})
+        self.assertIsNone(self.storage.get(User, self.state.id))
+        self.assertIs(self.storage.all(User)['User.' + self.user.id], user)
+        self.assertEqual(self.storage.count(User), 1)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_write_keeps_records(self):
+        """Test that changes keep the records not decoded yet."""
+        self.storage.all(State)
+        self.storage.new(Amenity(name='Wifi'))
+        self.storage.delete(self.storage.all(State)['State.' +
+                                                    self.state.id])
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(sorted(type(o).__name__
+                                for o in self.storage.all().values()),
+                         ['Amenity', 'City', 'User'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_rejects_other_files(self):
+        """Test that files that are not snapshots are refused."""
+        for content in (b'', b'{"State.1": {}}' * 4):
+            with open('file.snapshot', 'wb') as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                self.storage.reload()
+
+
+class TestFileStorageProcesses(unittest.TestCase):
+    """Unit tests for several processes sharing the same files."""
+
+    WRITER = '\n'.join([
+        'import sys',
+        'from models.state import State',
+        'for i in range(int(sys.argv[1])):',
+        '    State(name=sys.argv[2] + str(i)).save()',
+    ])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Work in an empty directory."""
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.env = dict(os.environ, PYTHONPATH=self.cwd)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def tearDown(self):
+        """Go back to the repository."""
+        FileStorage._FileStorage__objects = self.saved
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, writers, saves, **env):
+        """Run writers processes saving saves States each, at once."""
+        procs = [subprocess.Popen([sys.executable, '-c', self.WRITER,
+                                   str(saves), 'w{}-'.format(i)],
+                                  env=dict(self.env, **env))
+                 for i in range(writers)]
+        for proc in procs:
+            self.assertEqual(proc.wait(), 0)
+
+    def names(self):
+        """Return the names of the States stored, as a fresh process."""
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        return sorted(s.name for s in self.storage.all(State).values())
+
+    def expected(self, writers, saves):
+        """Return the names saved by write(writers, saves)."""
+        return sorted('w{}-{}'.format(i, j)
+                      for i in range(writers) for j in range(saves))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_concurrent_writers(self):
+        """Test that no save is lost when processes write at once."""
+        self.write(4, 10)
+        self.assertEqual(self.names(), self.expected(4, 10))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_concurrent_threads(self):
+        """Test that a thread waits for the lock held by another one."""
+        held, release, order = threading.Event(), threading.Event(), []
+
+        def hold():
+            with self.storage._FileStorage__locked(exclusive=True):
+                held.set()
+                release.wait(5)
+                order.append('hold')
+
+        def save():
+            self.storage.save()
+            order.append('save')
+
+        holder = threading.Thread(target=hold)
+        saver = threading.Thread(target=save)
+        holder.start()
+        held.wait(5)
+        saver.start()
+        saver.join(0.2)
+        self.assertTrue(saver.is_alive())
+        release.set()
+        holder.join(5)
+        saver.join(5)
+        self.assertEqual(order, ['hold', 'save'])
+        self.assertEqual(getattr(FileStorage._FileStorage__lock_depth,
+                                 'value', 0), 0)
+        with patch('fcntl.flock', wraps=fcntl.flock) as flock:
+            self.storage.save()
+        self.assertTrue(flock.called)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_concurrent_journal_writers(self):
+        """Test that no save is lost when processes journal at once."""
+        env = {'HBNB_FILE_JOURNAL': '1', 'HBNB_FILE_JOURNAL_MAX': '5'}
+        self.write(4, 10, **env)
+        with patch.dict(os.environ, env):
+            self.assertEqual(self.names(), self.expected(4, 10))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_merge_keeps_deletes(self):
+        """Test that save() merges the deletes of other processes."""
+        first, second = State(name='first'), State(name='second')
+        self.storage.new(first)
+        self.storage.new(second)
+        self.storage.save()
+        subprocess.run([sys.executable, '-c', '\n'.join([
+            'from models import storage',
+            'storage.delete(storage.all()["State.{}"])'.format(first.id),
+            'storage.save()'])], env=self.env, check=True)
+        second.name = 'changed'
+        second.save()
+        self.assertEqual(self.names(), ['changed'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_close_reloads_on_change(self):
+        """Test that close() only reads the files when they changed."""
+        self.storage.new(State(name='mine'))
+        self.storage.save()
+        with patch.object(JSONSerializer, 'read') as read:
+            self.storage.close()
+        read.assert_not_called()
+        self.write(1, 1)
+        pending = State(name='pending')
+        self.storage.new(pending)
+        self.storage.close()
+        names = sorted(s.name for s in self.storage.all(State).values())
+        self.assertEqual(names, ['mine', 'pending', 'w0-0'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_close_checks_generation(self):
+        """Test that close() reloads after another process saved, even if
+        the files look the same (e.g. a reused inode, same size and mtime
+        within the timestamp granularity)."""
+        same = staticmethod(lambda path: (1, 1, 1))
+        with patch.object(FileStorage, '_FileStorage__stamp', same):
+            self.storage.new(State(name='mine'))
+            self.storage.save()
+            with patch.object(JSONSerializer, 'read') as read:
+                self.storage.close()
+            read.assert_not_called()
+            self.write(1, 1)
+            self.storage.close()
+        names = sorted(s.name for s in self.storage.all(State).values())
+        self.assertEqual(names, ['mine', 'w0-0'])
@@ -16,6 +16,8 @@ from models.place import Place
 from models import storage
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class TestPlace_FileStorage(unittest.TestCase):
@@ -14,6 +14,8 @@ from models import storage
 
 
 STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
 
 
 class Test_Review_File_Storage(unittest.TestCase):
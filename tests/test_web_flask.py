@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""Defines unittests for the paginated web_flask routes."""
+import importlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+import models
+
+STORAGE_TYPE = os.getenv('HBNB_TYPE_STORAGE')
+if STORAGE_TYPE == 'sqlite':
+    STORAGE_TYPE = 'db'
+
+STATEMENTS = """
+import importlib
+import sys
+from sqlalchemy import event
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+statements = []
+event.listen(storage._DBStorage__engine, 'before_cursor_execute',
+             lambda *args: statements.append(args[2]))
+for i in range(int(sys.argv[1])):
+    state = State(name='State{}'.format(i))
+    city = City(name='City{}'.format(i), state_id=state.id)
+    user = User(email='{}@hbnb.io'.format(i), password='pwd')
+    place = Place(name='Place{}'.format(i), city_id=city.id,
+                  user_id=user.id)
+    place.amenities.append(Amenity(name='Amenity{}'.format(i)))
+    review = Review(text='Nice', place_id=place.id, user_id=user.id)
+    for obj in (state, city, user, place, review):
+        storage.new(obj)
+storage.save()
+storage.close()
+for module, url in (('8-cities_by_states', '/cities_by_states'),
+                    ('100-hbnb', '/hbnb')):
+    app = importlib.import_module('web_flask.' + module).app
+    del statements[:]
+    assert app.test_client().get(url).status_code == 200
+    print(len(statements))
+"""
+
+
+class TestPagination(unittest.TestCase):
+    """Unit tests for the page and limit parameters of the routes."""
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def setUp(self):
+        """Store five States, in no particular order, and two Cities."""
+        self.saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.states = {}
+        for name in ('Ohio', 'Iowa', 'Utah', 'Maine', 'Idaho'):
+            self.states[name] = State(name=name)
+            models.storage.new(self.states[name])
+        for name in ('Reno', 'Elko'):
+            models.storage.new(City(name=name,
+                                    state_id=self.states['Utah'].id))
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def tearDown(self):
+        """Restore the objects of the storage."""
+        FileStorage._FileStorage__objects = self.saved
+
+    def get(self, module, url):
+        """Return the page at url of web_flask.<module>, as text."""
+        app = importlib.import_module('web_flask.' + module).app
+        response = app.test_client().get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_data(as_text=True)
+
+    @staticmethod
+    def names(page):
+        """Return the bold names of page, in order."""
+        return re.findall(r'<B>(\w+)</B>', page)
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_states(self):
+        """Test that /states lists one sorted page of States."""
+        page = self.get('9-states', '/states?limit=2&page=2')
+        self.assertEqual(self.names(page), ['Maine', 'Ohio'])
+        self.assertIn('Page 2 of 3', page)
+        self.assertIn('href="/states?page=1&amp;limit=2"', page)
+        self.assertIn('href="/states?page=3&amp;limit=2"', page)
+        page = self.get('9-states', '/states?limit=2&page=9')
+        self.assertEqual(self.names(page), ['Utah'])
+        self.assertNotIn('rel="next"', page)
+        page = self.get('9-states', '/states?page=x')
+        self.assertEqual(self.names(page),
+                         ['Idaho', 'Iowa', 'Maine', 'Ohio', 'Utah'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_state_cities(self):
+        """Test that /states/<id> lists the sorted Cities."""
+        page = self.get('9-states',
+                        '/states/' + self.states['Utah'].id)
+        self.assertEqual(self.names(page), ['Elko', 'Reno'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_cities_by_states(self):
+        """Test that /cities_by_states pages States with their Cities."""
+        page = self.get('8-cities_by_states',
+                        '/cities_by_states?limit=2&page=3')
+        self.assertEqual(self.names(page), ['Utah', 'Elko', 'Reno'])
+
+    @unittest.skipIf(STORAGE_TYPE == 'db', 'Testing DBStorage')
+    def test_hbnb(self):
+        """Test that /hbnb lists one sorted page of Places."""
+        for name in ('Loft', 'Cabin', 'Barn'):
+            models.storage.new(Place(name=name))
+        page = self.get('100-hbnb', '/hbnb?limit=2')
+        self.assertEqual(re.findall(r'<H2>(\w+)</H2>\s*<DIV', page),
+                         ['Barn', 'Cabin'])
+        self.assertIn('Page 1 of 2', page)
+
+
+class TestStatements(unittest.TestCase):
+    """Tests of the SQL statements per page, run on SQLite in fresh processes.
+    """
+
+    def setUp(self):
+        """Work in an empty directory."""
+        self.tmp = tempfile.mkdtemp()
+        self.env = dict(os.environ, HBNB_TYPE_STORAGE='sqlite',
+                        PYTHONPATH=os.getcwd())
+        self.env.pop('HBNB_ENV', None)
+
+    def tearDown(self):
+        """Remove the databases."""
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def count(self, rows):
+        """Return the statements of /cities_by_states and /hbnb for rows."""
+        env = dict(self.env, HBNB_SQLITE_PATH=os.path.join(
+            self.tmp, '{}.db'.format(rows)))
+        out = subprocess.run([sys.executable, '-c', STATEMENTS, str(rows)],
+                             env=env, stdout=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+        return [int(count) for count in out.stdout.split()]
+
+    def test_no_query_per_row(self):
+        """Test that the relationships shown are loaded with their objects.
+        """
+        self.assertEqual(self.count(2), self.count(10))
+        self.assertEqual(self.count(10), [3, 7])
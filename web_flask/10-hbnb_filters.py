@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 
 from models import storage
+from models.city import City
+from models.state import State
 from flask import Flask
 from flask import render_template
+from web_flask.pagination import Page
 
 app = Flask(__name__)
 
@@ -11,17 +14,18 @@ app = Flask(__name__)
 #   strict_slashes=False to handle trailing slashes
 @app.route("/states", strict_slashes=False)
 def states():
-    """Displays an HTML page with a list of all States.
+    """Displays an HTML page with a page of States.
 
-    States are sorted by name.
+    States are sorted by name, see web_flask.pagination for the
+    'page' and 'limit' query parameters.
     """
-    # Fetch all State objects from the
+    # Fetch one page of State objects, sorted by the
     #   storage (FileStorage or DBStorage)
-    states = storage.all("State")
+    page = Page(State)
 
     # Render the "9-states.html" template and
-    #   pass the list of states as the variable 'state'
-    return render_template("9-states.html", state=states)
+    #   pass the states of the page as the variable 'states'
+    return render_template("9-states.html", states=page.items, page=page)
 
 
 # Define the route for '/states/<id>' and
@@ -30,16 +34,16 @@ def states():
 def states_id(id):
     """Displays an HTML page with info about <id>, if it exists."""
 
-    # Loop through all State objects in
+    # Look the State up by id in
     #   the storage (FileStorage or DBStorage)
-    for state in storage.all("State").values():
-
-        # Check if the current state object's id matches the requested <id>
-        if state.id == id:
-
-            # If a matching state is found,
-            #   render the "9-states.html" template and pass the state object
-            return render_template("9-states.html", state=state)
+    state = storage.get(State, id)
+    if state is not None:
+
+        # If a matching state is found, render the "9-states.html"
+        #   template and pass the state object and its sorted cities
+        cities = storage.query(City, state_id=state.id,
+                               order_by=["name", "id"])
+        return render_template("9-states.html", state=state, cities=cities)
 
     # If no matching state is found,
     #   render the "9-states.html" template without passing any state object
@@ -3,8 +3,13 @@
 """
 
 from models import storage
+from models.amenity import Amenity
+from models.place import Place
+from models.state import State
 from flask import Flask
 from flask import render_template
+from operator import attrgetter
+from web_flask.pagination import Page
 
 app = Flask(__name__)
 
@@ -13,19 +18,30 @@ app = Flask(__name__)
 #   strict_slashes=False to handle trailing slashes
 @app.route("/hbnb", strict_slashes=False)
 def hbnb():
-    """Displays the main HBnB filters HTML page."""
-    # Fetch all State, Amenity,
-    #   and Place objects from the storage (FileStorage or DBStorage)
-    states = storage.all("State")
+    """Displays the main HBnB filters HTML page.
 
-    amenities = storage.all("Amenity")
+    States, cities and amenities (the filters) are listed in full and
+    places one page at a time, all sorted by name by the storage; see
+    web_flask.pagination for the 'page' and 'limit' query parameters.
+    """
+    # Fetch the State, City and Amenity objects
+    #   sorted by the storage (FileStorage or DBStorage)
+    order = ["name", "id"]
+    states = storage.query(State, order_by=order, load="cities")
+    cities = {state.id: sorted(state.cities, key=attrgetter(*order))
+              for state in states}
 
-    places = storage.all("Place")
+    amenities = storage.query(Amenity, order_by=order)
+
+    # Fetch one page of Place objects, along with everything
+    #   the template shows of each
+    page = Page(Place, load=["user", "amenities", "reviews.user"])
 
     # Render the "100-hbnb.html" template and
     #   pass the fetched objects to the template
-    return render_template("100-hbnb.html", states=states,
-                           amenities=amenities, places=places)
+    return render_template("100-hbnb.html", states=states, cities=cities,
+                           amenities=amenities, places=page.items,
+                           page=page)
 
 
 # Teardown app context to remove the current
@@ -3,6 +3,7 @@
 from flask import Flask, render_template
 from models.state import State
 from models import storage
+from web_flask.pagination import Page
 
 # creates an instance of the Flask class and assigns
 # it to the variable app
@@ -19,10 +20,12 @@ def teardown(exception):
 @app.route('/states_list', strict_slashes=False)
 def states_list():
     """
-    displays a HTML page with a list of states
+    displays a HTML page with a page of states sorted by name
+    (see web_flask.pagination for the 'page' and 'limit' parameters)
     """
-    states = storage.all(State)
-    return render_template('7-states_list.html', states=states)
+    page = Page(State)
+    return render_template('7-states_list.html', states=page.items,
+                           page=page)
 
 
 if __name__ == "__main__":
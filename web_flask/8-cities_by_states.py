@@ -4,6 +4,8 @@
 from flask import Flask, render_template
 from models import storage
 from models.state import State
+from operator import attrgetter
+from web_flask.pagination import Page
 
 # creates an instance of the Flask class and assigns it to the variable app
 app = Flask(__name__)
@@ -20,15 +22,21 @@ def teardown(exception):
 # Define the route for '/cities_by_states'
 @app.route('/cities_by_states', strict_slashes=False)
 def cities_by_states():
-    """Displays an HTML page with a list of all states and related cities.
+    """Displays an HTML page with a page of states and related cities.
 
-    States/cities are sorted by name.
+    States/cities are sorted by name, see web_flask.pagination for the
+    'page' and 'limit' query parameters.
     """
-    # Fetch all State objects from the DBStorage
-    states = storage.all(State)
-
-    # Render the template and pass the list of states to the template
-    return render_template('8-cities_by_states.html', states=states)
+    # Fetch one page of State objects, sorted by the storage, along with
+    #   their cities (in one more query rather than one per state)
+    page = Page(State, load="cities")
+    # Sort the cities of each state of the page by name
+    cities = {state.id: sorted(state.cities, key=attrgetter("name", "id"))
+              for state in page.items}
+
+    # Render the template and pass the states of the page to the template
+    return render_template('8-cities_by_states.html', states=page.items,
+                           cities=cities, page=page)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from flask import Flask, render_template
 from models import storage
 from models.state import State
 from models.city import City
+from web_flask.pagination import Page
 
 app = Flask(__name__)
 
@@ -21,30 +22,33 @@ def teardown_app_context(exception):
 # Define the route for '/states'
 @app.route('/states', strict_slashes=False)
 def states():
-    """Displays an HTML page with a list of all States.
+    """Displays an HTML page with a page of States.
 
-    States are sorted by name.
+    States are sorted by name, see web_flask.pagination for the
+    'page' and 'limit' query parameters.
     """
-    # Fetch all State objects from the storage (FileStorage or DBStorage)
-    states = storage.all("State")
+    # Fetch one page of State objects, sorted by the storage
+    #   (FileStorage or DBStorage)
+    page = Page(State)
 
     # Render the "9-states.html" template and pass
-    #   the list of states as the variable 'state'
-    return render_template("9-states.html", state=states)
+    #   the states of the page as the variable 'states'
+    return render_template("9-states.html", states=page.items, page=page)
 
 
 # Define the route for '/states/<id>'
 @app.route('/states/<id>', strict_slashes=False)
 def states_by_id(id):
     """Displays an HTML page with info about <id>, if it exists."""
-    # Loop through all State objects in the storage
+    # Look the State up by id in the storage
     #   (either FileStorage or DBStorage)
-    for state in storage.all("State").values():
-        # Check if the current state object's id matches the requested <id>
-        if state.id == id:
-            # If a matching state is found,
-            #   render the template and pass the state object to the template
-            return render_template("9-states.html", state=state)
+    state = storage.get("State", id)
+    if state is not None:
+        # If a matching state is found, render the template and pass
+        #   the state object and its cities sorted by name to the template
+        cities = storage.query(City, state_id=state.id,
+                               order_by=["name", "id"])
+        return render_template("9-states.html", state=state, cities=cities)
     # If no matching state is found,
     #   render the template without passing any state object
     return render_template("9-states.html")
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Defines the Page class, the page of objects listed by a route.
+
+The page is read from the 'page' (1 by default) and 'limit' (50 by
+default, at most 500) query parameters of the request, e.g.
+/states?page=3&limit=20, and its objects are sorted and sliced by the
+storage, so that a request only instantiates (or, with DBStorage,
+selects) the objects of its page.
+"""
+from flask import request, url_for
+from models import storage
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class Page:
+    """Represents one page of the objects of a class.
+
+    Attributes:
+        limit (int): The number of objects per page.
+        total (int): The number of objects of the class.
+        pages (int): The number of pages, at least 1.
+        number (int): The number of this page, from 1 to pages.
+        items (list): The objects of this page, in order.
+    """
+
+    def __init__(self, cls, order_by=("name", "id"), load=None):
+        """Read the page of the current request.
+
+        Args:
+            cls (type|str): The class of the objects.
+            order_by (str|list): The ordering, see storage.query(); it
+                should end with a unique attribute so that pages do not
+                overlap.
+            load (str|list): The relationships to load with the objects,
+                see storage.query().
+        """
+        limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+        self.limit = min(max(limit, 1), MAX_LIMIT)
+        self.total = storage.count(cls)
+        self.pages = max((self.total + self.limit - 1) // self.limit, 1)
+        number = request.args.get("page", 1, type=int)
+        self.number = min(max(number, 1), self.pages)
+        self.items = storage.query(cls, order_by=list(order_by),
+                                   limit=self.limit,
+                                   offset=(self.number - 1) * self.limit,
+                                   load=load)
+
+    @property
+    def has_prev(self):
+        """Whether there is a page before this one."""
+        return self.number > 1
+
+    @property
+    def has_next(self):
+        """Whether there is a page after this one."""
+        return self.number < self.pages
+
+    def url(self, number):
+        """Return the URL of page number of the current route."""
+        return url_for(request.endpoint, page=number, limit=self.limit,
+                       **request.view_args)